@@ -0,0 +1,94 @@
+import contextvars
+import functools
+import logging
+from prometheus_client import Counter, Histogram, start_http_server
+from config import METRICS_EXPORTER_PORT
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+CYCLE_DURATION = Histogram(
+    'devops_agent_cycle_duration_seconds', 'Monitoring cycle duration by scheduler stage',
+    ['stage'], buckets=LATENCY_BUCKETS
+)
+PROMETHEUS_QUERY_DURATION = Histogram(
+    'devops_agent_prometheus_query_seconds', 'Prometheus query latency by tool and metric',
+    ['tool', 'metric', 'outcome'], buckets=LATENCY_BUCKETS
+)
+LLM_CALL_DURATION = Histogram(
+    'devops_agent_llm_call_seconds', 'Root cause analysis LLM call latency',
+    ['outcome'], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Histogram(
+    'devops_agent_llm_tokens', 'Tokens per root cause analysis LLM call',
+    ['direction'], buckets=TOKEN_BUCKETS
+)
+SLACK_DELIVERY_DURATION = Histogram(
+    'devops_agent_slack_delivery_seconds', 'Slack notification latency from submit to final attempt',
+    ['outcome'], buckets=LATENCY_BUCKETS
+)
+REMEDIATION_RECOVERY_DURATION = Histogram(
+    'devops_agent_remediation_recovery_seconds', 'Time from service restart to healthy metrics',
+    ['unit'], buckets=LATENCY_BUCKETS
+)
+SPIKES_OPENED = Counter('devops_agent_spikes_opened_total', 'Threshold breaches that started spike tracking', ['metric'])
+SPIKES_CLOSED = Counter('devops_agent_spikes_closed_total', 'Tracked spikes that cleared', ['metric'])
+REMEDIATION_DECISIONS = Counter(
+    'devops_agent_remediation_decisions_total', 'Automatic remediations versus human escalations', ['decision']
+)
+
+current_tool = contextvars.ContextVar('current_tool', default='monitor')
+
+
+def track_tool(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = current_tool.set(func.__name__)
+        try:
+            with span(f"tool.{func.__name__}"):
+                return func(*args, **kwargs)
+        finally:
+            current_tool.reset(token)
+    return wrapper
+
+
+def observe_queries(readings):
+    tool = current_tool.get()
+    for reading in readings:
+        PROMETHEUS_QUERY_DURATION.labels(tool, reading.name, 'error' if reading.error else 'ok').observe(reading.latency)
+
+
+def count_tokens(model: str, text: str) -> int:
+    try:
+        from litellm import token_counter
+        return token_counter(model=model, text=text)
+    except Exception:
+        return max(len(text) // 4, 1)
+
+
+def observe_llm_call(model: str, prompt: str, response, seconds: float):
+    succeeded = isinstance(response, str)
+    LLM_CALL_DURATION.labels('ok' if succeeded else 'error').observe(seconds)
+    LLM_TOKENS.labels('prompt').observe(count_tokens(model, prompt))
+    if succeeded:
+        LLM_TOKENS.labels('completion').observe(count_tokens(model, response))
+
+
+def observe_spikes(opened, cleared):
+    for _, metric in opened:
+        SPIKES_OPENED.labels(metric).inc()
+    for _, metric in cleared:
+        SPIKES_CLOSED.labels(metric).inc()
+
+
+def start_exporter(port=METRICS_EXPORTER_PORT) -> bool:
+    try:
+        start_http_server(port)
+    except OSError as e:
+        logger.warning(f"Metrics exporter could not bind port {port}: {e}")
+        return False
+    logger.info(f"Metrics exporter listening on :{port}/metrics")
+    return True
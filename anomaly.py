@@ -0,0 +1,127 @@
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from config import (
+    ANOMALY_BASELINE_HALFLIFE_SECONDS, ANOMALY_Z_THRESHOLD, ANOMALY_WARMUP_SAMPLES, ANOMALY_MIN_STDDEV,
+    ANOMALY_SUSTAIN_SECONDS, ANOMALY_SAVE_INTERVAL_SECONDS
+)
+
+STATE_KEY = '_anomaly'
+
+
+@dataclass
+class BaselineState:
+    mean: float = 0.0
+    variance: float = 0.0
+    count: int = 0
+    since: Optional[float] = None
+    updated: float = 0.0
+
+    def as_list(self) -> list:
+        return [self.mean, self.variance, self.count, self.since, self.updated]
+
+    @classmethod
+    def from_list(cls, values) -> 'BaselineState':
+        mean, variance, count, since, updated = values
+        return cls(float(mean), float(variance), int(count), None if since is None else float(since), float(updated))
+
+
+@dataclass
+class AnomalyResult:
+    scores: Dict[str, float] = field(default_factory=dict)
+    anomalous: Dict[str, int] = field(default_factory=dict)
+    sustained: Dict[str, int] = field(default_factory=dict)
+    warming: List[str] = field(default_factory=list)
+
+
+class AnomalyDetector:
+    def __init__(self, halflife=ANOMALY_BASELINE_HALFLIFE_SECONDS, z_threshold=ANOMALY_Z_THRESHOLD,
+                 warmup=ANOMALY_WARMUP_SAMPLES, min_stddev=ANOMALY_MIN_STDDEV, sustain=ANOMALY_SUSTAIN_SECONDS,
+                 save_interval=ANOMALY_SAVE_INTERVAL_SECONDS, tracker=None):
+        self.decay = math.log(2) / halflife
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.min_stddev = min_stddev
+        self.sustain = sustain
+        self.save_interval = save_interval
+        self.tracker = tracker
+        self.states = self.load()
+        self.last_saved = 0.0
+
+    def load(self) -> Dict[str, BaselineState]:
+        if self.tracker is None:
+            return {}
+        with self.tracker.lock:
+            stored = self.tracker.spike_times.get(STATE_KEY)
+        states = {}
+        if isinstance(stored, dict):
+            for metric, values in stored.items():
+                try:
+                    states[metric] = BaselineState.from_list(values)
+                except:
+                    continue
+        return states
+
+    def save(self, now: float):
+        if self.tracker is not None:
+            self.tracker.store(STATE_KEY, {metric: state.as_list() for metric, state in self.states.items()})
+            self.last_saved = now
+
+    def update(self, metric: str, value: float, now: float) -> float:
+        state = self.states.setdefault(metric, BaselineState(mean=value, updated=now))
+        deviation = value - state.mean
+        stddev = max(math.sqrt(state.variance), self.min_stddev)
+        score = deviation / stddev
+
+        alpha = max(1 - math.exp(-self.decay * max(now - state.updated, 0.0)), 1 / (state.count + 1))
+        increment = alpha * deviation
+        state.mean += increment
+        if state.count <= self.warmup or abs(score) <= self.z_threshold:
+            state.variance = (1 - alpha) * (state.variance + deviation * increment)
+        state.count += 1
+        state.updated = now
+        return score
+
+    def observe(self, values: Dict[str, float], now: Optional[float] = None) -> AnomalyResult:
+        now = time.time() if now is None else now
+        result = AnomalyResult()
+        changed = False
+
+        for metric, value in values.items():
+            score = self.update(metric, value, now)
+            state = self.states[metric]
+            result.scores[metric] = score
+
+            if state.count <= self.warmup:
+                result.warming.append(metric)
+                continue
+
+            if score > self.z_threshold:
+                if state.since is None:
+                    state.since = now
+                    changed = True
+                duration = int(now - state.since)
+                result.anomalous[metric] = duration
+                if duration >= self.sustain:
+                    result.sustained[metric] = duration
+            elif state.since is not None:
+                state.since = None
+                changed = True
+
+        if changed or now - self.last_saved >= self.save_interval:
+            self.save(now)
+        return result
+
+    def escalate(self, static_issues: Dict[str, int], result: AnomalyResult, mode: str) -> Dict[str, int]:
+        if mode == 'confirm':
+            return {
+                metric: duration for metric, duration in static_issues.items()
+                if metric in result.sustained or metric in result.warming
+            }
+        if mode == 'combined':
+            escalated = dict(static_issues)
+            for metric, duration in result.sustained.items():
+                escalated.setdefault(metric, duration)
+            return escalated
+        return static_issues
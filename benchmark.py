@@ -0,0 +1,552 @@
+import os
+os.environ.setdefault('LITELLM_LOCAL_MODEL_COST_MAP', 'True')
+import io
+import json
+import time
+import argparse
+import resource
+import tempfile
+import logging
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+import requests
+import numpy as np
+import logging_config
+from logging_config import JSONFormatter, FastJSONFormatter
+from metrics_collector import PrometheusCollector, QUERIES, RECOVERY_QUERIES, METRICS
+from detection import DetectionEngine
+from anomaly import AnomalyDetector
+from metric_history import MetricHistory
+from journal import JournalCollector
+from rca_cache import RCACache
+from remediation import RemediationExecutor, ActionRunner
+from log_templates import TemplateMiner
+from config import METRIC_HISTORY_DIR
+from fleet import FLEET_QUERIES, FleetCollector, FleetMonitor
+from spike_tracker import SpikeTracker
+from scheduler import StageTimer
+from agent_metrics import count_tokens
+from stub_servers import StubPrometheus, StubSlack, StubLLM, StubSystemctl, StubActionExecutor, ScriptedSeries
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+    print(f"{name:<28} mean={statistics.mean(samples)*1000:8.2f}ms  p50={statistics.median(samples)*1000:8.2f}ms  p95={p95*1000:8.2f}ms")
+    return statistics.mean(samples)
+
+
+def bench_prometheus(rounds=20, latency=0.02):
+    values = {
+        QUERIES['cpu']: 42.0,
+        QUERIES['memory']: 55.0,
+        QUERIES['disk']: 30.0,
+        QUERIES['network']: 1.5,
+    }
+    with StubPrometheus(values, latency=latency) as stub:
+        serial = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for query in QUERIES.values():
+                requests.get(f"{stub.url}/api/v1/query", params={'query': query}).json()
+            serial.append(time.perf_counter() - started)
+
+        collector = PrometheusCollector(stub.url)
+        batched = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            collector.collect()
+            batched.append(time.perf_counter() - started)
+
+    print(f"Prometheus collection ({len(QUERIES)} queries, {latency*1000:.0f}ms stub latency, {rounds} rounds)")
+    serial_mean = report("serial requests.get", serial)
+    batched_mean = report("PrometheusCollector", batched)
+    print(f"speedup: {serial_mean / batched_mean:.2f}x")
+
+
+def bench_log_formatter(records=50000):
+    metrics = {'cpu': '82.15%', 'memory': '64.02%', 'disk': '41.90%', 'network': '3.21 MB', 'confidence': 'High'}
+    batch = [
+        logging.makeLogRecord({
+            'name': 'devops-agent', 'levelno': logging.INFO, 'levelname': 'INFO',
+            'msg': 'System status normal', 'module': 'tools', 'funcName': 'system_overview', 'lineno': 1,
+            'metrics': metrics, 'alert_type': 'status'
+        })
+        for _ in range(records)
+    ]
+
+    formatters = [
+        ("JSONFormatter", JSONFormatter()),
+        ("FastJSONFormatter (json)", FastJSONFormatter(use_orjson=False)),
+        ("FastJSONFormatter (orjson)", FastJSONFormatter()),
+    ]
+    print(f"Log formatting ({records} metric records)")
+    baseline = None
+    for name, formatter in formatters:
+        started = time.perf_counter()
+        for record in batch:
+            formatter.format(record)
+        rate = records / (time.perf_counter() - started)
+        baseline = baseline or rate
+        print(f"{name:<28} {rate:12,.0f} records/s  ({rate / baseline:.2f}x)")
+
+
+def bench_fleet(targets=1000, rounds=10, breach_ratio=0.1):
+    def series(base):
+        def values(query):
+            return [
+                ({'instance': f"node-{i:04d}:9100"}, base + (40 if i < targets * breach_ratio else 0) + (i % 7))
+                for i in range(targets)
+            ]
+        return values
+
+    values = {
+        FLEET_QUERIES['cpu']: series(40),
+        FLEET_QUERIES['memory']: series(50),
+        FLEET_QUERIES['disk']: series(30),
+        FLEET_QUERIES['network']: series(20),
+    }
+    with tempfile.TemporaryDirectory() as tmp, StubPrometheus(values) as stub:
+        tracker = SpikeTracker(os.path.join(tmp, 'fleet.json'))
+        monitor = FleetMonitor(FleetCollector(stub.url), tracker, DetectionEngine(tracker=tracker, spike_duration=0))
+        collect, evaluate = [], []
+        for _ in range(rounds):
+            snapshot = monitor.collector.collect()
+            collect.append(snapshot.duration)
+            evaluation = monitor.evaluate(snapshot)
+            evaluate.append(evaluation.duration)
+
+    print(f"Fleet evaluation ({targets} targets x {len(FLEET_QUERIES)} metrics, {rounds} rounds)")
+    report("collect (4 vector queries)", collect)
+    report("evaluate thresholds+spikes", evaluate)
+    print(f"sustained issues on last round: {len(evaluation.sustained)}")
+
+
+def bench_detection(rounds=200):
+    rng = np.random.default_rng(0)
+    print(f"Detection engine ({rounds} rounds per size)")
+    for targets in (1, 1000, 10000):
+        engine = DetectionEngine(spike_duration=0)
+        names = [f"node-{i}" for i in range(targets)]
+        baseline = rng.uniform(0, 100, size=(targets, len(engine.metrics)))
+        samples = []
+        for round_number in range(rounds):
+            values = baseline + rng.normal(0, 1, size=baseline.shape)
+            started = time.perf_counter()
+            engine.evaluate(values, names, now=float(round_number))
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        print(f"{targets:>6} targets  p50={samples[len(samples) // 2]*1e6:10.1f}us  max={samples[-1]*1e6:10.1f}us")
+
+
+def anomaly_scenarios(hours=6, step=5.0, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(0, hours * 3600, step)
+    midpoint = timestamps[len(timestamps) // 2]
+
+    busy = 85 + rng.normal(0, 3, len(timestamps))
+
+    incident = 30 + rng.normal(0, 3, len(timestamps))
+    incident_window = (timestamps >= midpoint) & (timestamps < midpoint + 600)
+    incident[incident_window] = 95 + rng.normal(0, 2, incident_window.sum())
+
+    leak = 40 + rng.normal(0, 1, len(timestamps))
+    leak_window = timestamps >= midpoint
+    leak[leak_window] += (timestamps[leak_window] - midpoint) / 60 * 0.3
+
+    bursts = 30 + rng.normal(0, 3, len(timestamps))
+    bursts[(timestamps % 1800) < 60] = 90
+
+    return timestamps, [
+        ("busy host (cpu ~85%)", 'cpu', busy, np.zeros(len(timestamps), dtype=bool)),
+        ("cpu incident (10 min)", 'cpu', incident, incident_window),
+        ("memory leak (<80%)", 'memory', leak, leak_window),
+        ("60s bursts every 30 min", 'cpu', bursts, np.zeros(len(timestamps), dtype=bool)),
+    ]
+
+
+def replay(timestamps, metric, series, mode):
+    engine = DetectionEngine()
+    detector = AnomalyDetector()
+    escalations = np.zeros(len(series), dtype=bool)
+    started = time.perf_counter()
+    for i, (now, value) in enumerate(zip(timestamps, series)):
+        detection = engine.evaluate_target({metric: value}, now=now)
+        static_issues = {name: detection.duration(name) for name in detection.issues()}
+        if mode != 'off':
+            static_issues = detector.escalate(static_issues, detector.observe({metric: value}, now), mode)
+        escalations[i] = metric in static_issues
+    return escalations, (time.perf_counter() - started) / len(series)
+
+
+def episodes(flags):
+    return np.flatnonzero(flags & ~np.concatenate(([False], flags[:-1])))
+
+
+def bench_anomaly():
+    timestamps, scenarios = anomaly_scenarios()
+    recorded = MetricHistory(directory=METRIC_HISTORY_DIR, readonly=True) if os.path.isdir(METRIC_HISTORY_DIR) else None
+    if recorded:
+        for name in recorded.buffers:
+            times, values = recorded.range(name)
+            if len(values):
+                scenarios.append((f"recorded {name} ({len(values)} samples)", name, values, np.zeros(len(values), dtype=bool)))
+
+    print(f"Anomaly detection replay (escalation episodes; true/false against labelled incident windows)")
+    for label, metric, series, truth in scenarios:
+        times = timestamps if len(series) == len(timestamps) else np.arange(len(series)) * 5.0
+        print(f"  {label}")
+        for mode in ('off', 'confirm', 'combined'):
+            escalations, per_sample = replay(times, metric, series, mode)
+            starts = episodes(escalations)
+            true_positive = int(truth[starts].sum())
+            delay = ""
+            if truth.any() and true_positive:
+                delay = f"  delay={times[starts[truth[starts]][0]] - times[np.argmax(truth)]:.0f}s"
+            print(f"    {mode:<9} episodes={len(starts):3d}  true={true_positive}  false={len(starts) - true_positive:3d}"
+                  f"  escalated={escalations.mean()*100:5.1f}% of samples  {per_sample*1e6:6.1f}us/sample{delay}")
+
+
+def synthetic_journal(lines, seed=0):
+    rng = np.random.default_rng(seed)
+    templates = [
+        ('nginx.service', 6, "{ip} - - \"GET /api/v1/items/{n} HTTP/1.1\" 200 {n} \"-\" \"curl/8.{d}\""),
+        ('nginx.service', 4, "upstream timed out (110: Connection timed out) while reading response header from upstream, client: {ip}"),
+        ('dockerd', 6, "time=\"{ts}\" level=info msg=\"ignoring event\" container={hex} module=libcontainerd namespace=moby"),
+        ('dockerd', 3, "time=\"{ts}\" level=error msg=\"Handler for POST /v1.43/containers/{hex}/start returned error\""),
+        ('kernel', 3, "Out of memory: Killed process {n} (java) total-vm:{n}kB, anon-rss:{n}kB"),
+        ('kernel', 4, "TCP: request_sock_TCP: Possible SYN flooding on port {n}. Sending cookies."),
+        ('sshd', 5, "Accepted publickey for deploy from {ip} port {n} ssh2"),
+        ('sshd', 5, "Disconnected from user deploy {ip} port {n}"),
+        ('systemd', 6, "Started Session {n} of User deploy."),
+        ('systemd', 6, "session-{n}.scope: Deactivated successfully."),
+        ('cron', 6, "(root) CMD (/usr/local/bin/backup.sh --target s3://bucket/{n})"),
+        ('app.service', 3, "ERROR db pool exhausted: {n} active connections, wait {n}ms"),
+    ]
+    weights = np.array([40, 3, 15, 1, 0.2, 1, 5, 5, 8, 8, 2, 1.5])
+    choices = rng.choice(len(templates), size=lines, p=weights / weights.sum())
+    entries = []
+    for index in choices:
+        unit, priority, template = templates[index]
+        message = template.format(
+            ip=f"10.0.{rng.integers(256)}.{rng.integers(256)}", n=rng.integers(100000), d=rng.integers(10),
+            ts=f"2024-05-01T12:{rng.integers(60):02d}:{rng.integers(60):02d}", hex=f"{rng.integers(2**63):016x}"
+        )
+        entries.append((message, unit, priority))
+    return entries, len(templates)
+
+
+def bench_templates(lines=200000):
+    entries, expected = synthetic_journal(lines)
+    miner = TemplateMiner()
+    started = time.perf_counter()
+    for message, unit, priority in entries:
+        miner.add(message, unit, priority)
+    elapsed = time.perf_counter() - started
+
+    summary = miner.summary(15)
+    raw_chars = sum(len(message) for message, _, _ in entries)
+    summary_chars = sum(len(line) for line in summary)
+    print(f"Log template mining ({lines} synthetic journal lines, {expected} source templates)")
+    print(f"throughput: {lines / elapsed:12,.0f} lines/s")
+    print(f"clusters: {len(miner.clusters)}  prompt context: {raw_chars:,} -> {summary_chars:,} chars")
+    for line in summary[:5]:
+        print(f"  {line[:150]}")
+
+
+SCENARIO_BASELINE = {'cpu': 35.0, 'memory': 55.0, 'disk': 40.0, 'network': 2.0}
+SCENARIO_INTERVAL = 0.25
+SCENARIO_SPIKE_DURATION = 1.0
+SCENARIO_DURATION = 8.0
+
+
+def incident_scripts():
+    cpu, memory, disk = METRICS['cpu'].threshold, METRICS['memory'].threshold, METRICS['disk'].threshold
+    return [
+        ("cpu saturation", 'cpu', [(2.0, SCENARIO_DURATION, cpu + 25)], True),
+        ("memory leak ramp", 'memory', [(1.0, SCENARIO_DURATION, lambda t: SCENARIO_BASELINE['memory'] + t * 12)], True),
+        ("disk fill", 'disk', [(2.0, SCENARIO_DURATION, disk + 20)], True),
+        ("memory flapping", 'memory', [(1.0 + i, 1.4 + i, memory + 5) for i in range(6)], False),
+    ]
+
+
+class ScriptedJournal(JournalCollector):
+    def __init__(self, lines=2000):
+        super().__init__(cache_seconds=60)
+        self.entries, _ = synthetic_journal(lines)
+
+    def stream_entries(self):
+        now = time.time()
+        for message, unit, priority in self.entries:
+            yield {'unit': unit, 'message': message, 'priority': int(priority), 'timestamp': now}
+
+
+def percentiles(samples):
+    if not samples:
+        return {'count': 0}
+    values = np.array(samples) * 1000
+    return {
+        'count': len(samples),
+        'p50_ms': round(float(np.percentile(values, 50)), 2),
+        'p95_ms': round(float(np.percentile(values, 95)), 2),
+        'p99_ms': round(float(np.percentile(values, 99)), 2),
+        'max_ms': round(float(values.max()), 2)
+    }
+
+
+class RecordingTimer(StageTimer):
+    def __init__(self):
+        super().__init__()
+        self.samples = {}
+
+    def observe(self, stage, seconds):
+        super().observe(stage, seconds)
+        self.samples.setdefault(stage, []).append(seconds)
+
+
+def call_tool(tool):
+    return getattr(tool, 'func', tool)()
+
+
+def console_handlers():
+    handlers = list(logging_config._listener.handlers) if logging_config._listener is not None else []
+    for logger in logging.Logger.manager.loggerDict.values():
+        handlers.extend(getattr(logger, 'handlers', []))
+    return [
+        handler for handler in handlers
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler)
+    ]
+
+
+class ScenarioHarness:
+    def __init__(self, metric, steps, llm_latency=0.2, prometheus_latency=0.005):
+        import tools
+        import notifications
+        self.tools = tools
+        self.notifications = notifications
+        self.metric = metric
+        self.series = {
+            name: ScriptedSeries(baseline, steps if name == metric else None)
+            for name, baseline in SCENARIO_BASELINE.items()
+        }
+        values = {QUERIES[name]: series for name, series in self.series.items()}
+        values.update({RECOVERY_QUERIES[name]: series for name, series in self.series.items()})
+        self.prometheus = StubPrometheus(values, latency=prometheus_latency)
+        self.slack = StubSlack()
+        self.llm = StubLLM(latency=llm_latency)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def resolve(self, *args):
+        self.series[self.metric].resolve()
+
+    def onset(self):
+        return self.series[self.metric].onset(METRICS[self.metric].threshold, SCENARIO_DURATION)
+
+    def __enter__(self):
+        tools, notifications = self.tools, self.notifications
+        self.prometheus.start()
+        self.slack.start()
+        os.environ['SLACK_WEBHOOK_URL'] = self.slack.url
+
+        tools.collector = PrometheusCollector(self.prometheus.url)
+        tools.recovery_collector = PrometheusCollector(self.prometheus.url, queries=RECOVERY_QUERIES)
+        tools.llm = self.llm
+        tools.spike_tracker = SpikeTracker(os.path.join(self.tmp.name, 'spikes.json'))
+        tools.detection_engine = DetectionEngine(tracker=tools.spike_tracker, spike_duration=SCENARIO_SPIKE_DURATION)
+        tools.anomaly_detector = AnomalyDetector(tracker=tools.spike_tracker)
+        tools.rca_cache = RCACache()
+        tools.metric_history = MetricHistory(capacity=1024)
+        tools.journal_collector = ScriptedJournal()
+        tools.remediation_executor = RemediationExecutor(
+            StubSystemctl(activation=0.1, on_restart=self.resolve), metrics=tools.get_recovery_metrics,
+            recovery_deadline=5.0, initial_backoff=0.05, max_backoff=0.5
+        )
+        tools.action_runner = ActionRunner(StubActionExecutor(tools.remediation_executor, on_action=self.resolve))
+        notifications.alert_deduplicator = notifications.AlertDeduplicator()
+        notifications.delivery_queue = notifications.SlackDeliveryQueue(
+            rate=100.0, burst=100, spill_file=os.path.join(self.tmp.name, 'spill.jsonl')
+        )
+
+        self.console_levels = [(handler, handler.level) for handler in console_handlers()]
+        for handler, _ in self.console_levels:
+            handler.setLevel(logging.CRITICAL)
+        for series in self.series.values():
+            series.start()
+        return self
+
+    def alerts(self):
+        self.notifications.delivery_queue.close()
+        titles = {}
+        for payload in self.slack.payloads:
+            title = payload['text'].replace('ALERT:: ', '').split(' - ')[0]
+            titles[title] = titles.get(title, 0) + 1
+        return {'total': len(self.slack.payloads), 'by_title': titles}
+
+    def __exit__(self, *exc):
+        self.notifications.delivery_queue.close()
+        for handler, level in self.console_levels:
+            handler.setLevel(level)
+        self.prometheus.stop()
+        self.slack.stop()
+        self.tmp.cleanup()
+
+
+def measure_memory(run):
+    tracemalloc.start()
+    try:
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result['memory'] = {
+        'tracemalloc_peak_kb': round(peak / 1024, 1),
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+    return result
+
+
+def drive_tools(harness):
+    overview, remediation = [], []
+    detected = None
+    ticks = 0
+    next_tick = time.monotonic()
+    series = harness.series[harness.metric]
+    while series.elapsed() < SCENARIO_DURATION:
+        started = time.perf_counter()
+        output = call_tool(harness.tools.system_overview)
+        overview.append(time.perf_counter() - started)
+        ticks += 1
+        if detected is None and "SUSTAINED ISSUES DETECTED" in output:
+            detected = series.elapsed()
+            started = time.perf_counter()
+            call_tool(harness.tools.confidence_based_remediation)
+            remediation.append(time.perf_counter() - started)
+        next_tick += SCENARIO_INTERVAL
+        time.sleep(max(next_tick - time.monotonic(), 0.0))
+    return {'ticks': ticks, 'detected_at': detected, 'system_overview': percentiles(overview),
+            'confidence_based_remediation': percentiles(remediation)}
+
+
+def drive_monitor(harness):
+    import monitor
+    detected = []
+    timers = []
+
+    def recording_timer():
+        timers.append(RecordingTimer())
+        return timers[-1]
+
+    def scripted_crew():
+        if not detected:
+            detected.append(harness.series[harness.metric].elapsed())
+        return '\n'.join(call_tool(tool) for tool in (harness.tools.system_overview, harness.tools.confidence_based_remediation))
+
+    patched = {
+        'run_crew': scripted_crew, 'StageTimer': recording_timer, 'journal_collector': harness.tools.journal_collector,
+        'FAST_PATH_ENABLED': True, 'FLEET_MODE_ENABLED': False, 'METRICS_EXPORTER_ENABLED': False,
+        'FAST_PATH_INTERVAL_SECONDS': SCENARIO_INTERVAL, 'shutdown_logging': lambda: None
+    }
+    original = {name: getattr(monitor, name) for name in patched}
+    for name, value in patched.items():
+        setattr(monitor, name, value)
+    try:
+        with redirect_stdout(io.StringIO()):
+            stats = monitor.continuous_monitor(max_ticks=int(SCENARIO_DURATION / SCENARIO_INTERVAL))
+    finally:
+        for name, value in original.items():
+            setattr(monitor, name, value)
+    stages = {stage: percentiles(samples) for stage, samples in timers[0].samples.items()}
+    return {'detected_at': detected[0] if detected else None, 'stages': stages, 'scheduler': stats}
+
+
+def run_incident(driver, label, metric, steps, expect_alert, llm_latency):
+    with ScenarioHarness(metric, steps, llm_latency=llm_latency) as harness:
+        result = measure_memory(lambda: driver(harness))
+        onset = harness.onset()
+        detected = result.pop('detected_at')
+        result.update({
+            'scenario': label,
+            'metric': metric,
+            'onset_s': round(onset, 2) if onset is not None else None,
+            'detection_delay_s': round(detected - onset, 2) if detected is not None and onset is not None else None,
+            'false_positive': detected is not None and not expect_alert,
+            'missed': detected is None and expect_alert,
+            'llm_calls': harness.llm.calls,
+            'alerts': harness.alerts()
+        })
+    return result
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare_results(previous, current, tolerance=0.1):
+    before, after = flatten(previous), flatten(current)
+    changed = []
+    for name in sorted(set(before) & set(after)):
+        if before[name] and abs(after[name] - before[name]) / abs(before[name]) > tolerance:
+            changed.append((name, before[name], after[name]))
+    print(f"Changes beyond {tolerance:.0%} against baseline ({len(changed)} of {len(set(before) & set(after))} values)")
+    for name, old, new in changed:
+        print(f"  {name:<70} {old:>12} -> {new:<12} ({(new - old) / abs(old):+.0%})")
+    return changed
+
+
+def bench_scenarios(llm_latency=0.2):
+    count_tokens(StubLLM().model, "warm up tokenizer")
+    results = {}
+    print(f"Scripted incidents ({SCENARIO_DURATION:.0f}s each, {SCENARIO_INTERVAL}s ticks, "
+          f"{SCENARIO_SPIKE_DURATION}s sustain, {llm_latency*1000:.0f}ms stub LLM)")
+    for driver_name, driver in (('tools', drive_tools), ('continuous_monitor', drive_monitor)):
+        for label, metric, steps, expect_alert in incident_scripts():
+            result = run_incident(driver, label, metric, steps, expect_alert, llm_latency)
+            results[f"{driver_name}/{label}"] = result
+            latency = result['system_overview'] if driver is drive_tools else result['stages'].get('tick', {})
+            delay = result['detection_delay_s']
+            print(f"  {driver_name + '/' + label:<36} p50={latency.get('p50_ms', 0):8.2f}ms  p95={latency.get('p95_ms', 0):8.2f}ms"
+                  f"  delay={'-' if delay is None else f'{delay:.2f}s':>6}  alerts={result['alerts']['total']:2d}"
+                  f"  llm={result['llm_calls']}  peak={result['memory']['tracemalloc_peak_kb']:8.1f}KB"
+                  f"{'  FALSE POSITIVE' if result['false_positive'] else ''}{'  MISSED' if result['missed'] else ''}")
+    return results
+
+
+BENCHMARKS = {
+    'prometheus': bench_prometheus,
+    'log_formatter': bench_log_formatter,
+    'fleet': bench_fleet,
+    'detection': bench_detection,
+    'anomaly': bench_anomaly,
+    'templates': bench_templates,
+    'scenarios': bench_scenarios,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--output', help="write benchmark results as JSON")
+    parser.add_argument('--compare', help="JSON results from a previous run to compare against")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.names or list(BENCHMARKS):
+        result = BENCHMARKS[name]()
+        if result is not None:
+            results[name] = result
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f), results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), **results}, f, indent=2)
+        print(f"Results written to {args.output}")
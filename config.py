@@ -2,15 +2,93 @@ import os
 
 PROMETHEUS_URL = "http://localhost:9090"
 NODE_EXPORTER_URL = "http://localhost:9100"
+PROMETHEUS_QUERY_TIMEOUT_SECONDS = 5
+PROMETHEUS_SCRAPE_INTERVAL_SECONDS = 15
 CPU_THRESHOLD = 70
 MEMORY_THRESHOLD = 80
 DISK_THRESHOLD = 60
 NETWORK_THRESHOLD = 70
 
 SPIKE_DURATION_SECONDS = 120
+SPIKE_TRACKING_FILE = "/tmp/devops_spike_tracking.json"
 MONITORING_INTERVAL_SECONDS = 60
+ANOMALY_DETECTION_MODE = os.getenv("ANOMALY_DETECTION_MODE", "off").lower()
+ANOMALY_BASELINE_HALFLIFE_SECONDS = 3600
+ANOMALY_Z_THRESHOLD = 3.0
+ANOMALY_WARMUP_SAMPLES = 30
+ANOMALY_MIN_STDDEV = 1.0
+ANOMALY_SUSTAIN_SECONDS = 60
+ANOMALY_SAVE_INTERVAL_SECONDS = 60
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+FAST_PATH_INTERVAL_SECONDS = 5
+ESCALATION_COOLDOWN_SECONDS = 600
+SCHEDULER_OVERRUN_POLICY = os.getenv("SCHEDULER_OVERRUN_POLICY", "coalesce").lower()
+SCHEDULER_ANALYSIS_WORKERS = 1
+SCHEDULER_REPORT_INTERVAL_SECONDS = 300
+METRICS_EXPORTER_ENABLED = os.getenv("METRICS_EXPORTER_ENABLED", "true").lower() == "true"
+METRICS_EXPORTER_PORT = int(os.getenv("METRICS_EXPORTER_PORT", "9200"))
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+PROFILE_SLOW_CYCLES = os.getenv("PROFILE_SLOW_CYCLES", "false").lower() == "true"
+PROFILE_SLOW_CYCLE_SECONDS = 30
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.01
+PROFILE_DIR = "/tmp/devops_agent_profiles"
+
+METRIC_HISTORY_CAPACITY = 17280
+METRIC_HISTORY_PERSIST = os.getenv("METRIC_HISTORY_PERSIST", "false").lower() == "true"
+METRIC_HISTORY_DIR = "/tmp/devops_metric_history"
+METRIC_HISTORY_WINDOW_SECONDS = 900
+
+FLEET_MODE_ENABLED = os.getenv("FLEET_MODE_ENABLED", "false").lower() == "true"
+FLEET_DISK_MOUNTPOINT = "/"
+FLEET_NETWORK_DEVICE_EXCLUDE = "lo|veth.*|docker.*|br-.*"
+FLEET_SPIKE_TRACKING_FILE = "/tmp/devops_fleet_spike_tracking.json"
+FLEET_TARGET_STALE_SECONDS = 300
+
+JOURNAL_SINCE = "5 minutes ago"
+JOURNAL_PRIORITY = os.getenv("JOURNAL_PRIORITY", "info")
+JOURNAL_UNITS = [unit for unit in os.getenv("JOURNAL_UNITS", "").split(",") if unit]
+JOURNAL_MAX_ENTRIES = 50000
+JOURNAL_EXCERPT_LINES = 40
+JOURNAL_TIMEOUT_SECONDS = 10
+JOURNAL_CACHE_SECONDS = 30
+TEMPLATE_SIMILARITY = 0.5
+TEMPLATE_MAX_CLUSTERS = 1000
+TEMPLATE_MAX_CHILDREN = 100
+TEMPLATE_MAX_TOKENS = 40
+TEMPLATE_SAMPLE_VALUES = 3
+RCA_LOG_TEMPLATES = 15
+
+REMEDIATION_SERVICE = "docker"
+REMEDIATION_RESTART_TIMEOUT_SECONDS = 30
+REMEDIATION_RECOVERY_DEADLINE_SECONDS = 60
+REMEDIATION_POLL_INITIAL_SECONDS = 0.25
+REMEDIATION_POLL_MAX_SECONDS = 5
+REMEDIATION_RECOVERY_RATE_WINDOW = f"{max(30, 4 * PROMETHEUS_SCRAPE_INTERVAL_SECONDS)}s"
+REMEDIATION_MAX_BLAST_RADIUS = os.getenv("REMEDIATION_MAX_BLAST_RADIUS", "service")
+REMEDIATION_CACHE_DIRS = [path for path in os.getenv("REMEDIATION_CACHE_DIRS", "").split(",") if path]
+REMEDIATION_LOGROTATE_CONFIG = "/etc/logrotate.conf"
+REMEDIATION_PROTECTED_PROCESSES = ("systemd", "sshd", "dockerd", "containerd", "init")
+LOAD_TICK_SECONDS = 0.5
+LOAD_CPU_PERIOD_SECONDS = 0.1
+LOAD_MAX_MEMORY_PERCENT = 95
+LOAD_MEMORY_CHUNK_MB = 16
+LOAD_DISK_MIN_FREE_MB = 1024
+LOAD_DISK_WRITE_MB_PER_TICK = 256
+LOAD_NETWORK_CHUNK_BYTES = 65536
+
+RCA_CACHE_SIZE = 128
+RCA_CACHE_TTL_SECONDS = 900
+RCA_CACHE_METRIC_BUCKET = 10
 
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "")
+SLACK_QUEUE_SIZE = 100
+SLACK_RATE_PER_SECOND = 1.0
+SLACK_BURST = 3
+SLACK_MAX_RETRIES = 5
+SLACK_TIMEOUT_SECONDS = 10
+SLACK_SPILL_FILE = "/tmp/devops_slack_spill.jsonl"
+ALERT_SUPPRESSION_SECONDS = 1800
+ALERT_DIGEST_INTERVAL_SECONDS = 600
 EMAIL_SMTP_SERVER = os.getenv("EMAIL_SMTP_SERVER", "")
 EMAIL_USERNAME = os.getenv("EMAIL_USERNAME", "")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
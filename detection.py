@@ -0,0 +1,180 @@
+import time
+import numpy as np
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence, Tuple
+from config import SPIKE_DURATION_SECONDS, FLEET_TARGET_STALE_SECONDS
+from metrics_collector import METRIC_DEFINITIONS
+from agent_metrics import observe_spikes
+
+LOCAL_TARGET = ''
+
+
+def spike_key(target: str, metric: str) -> str:
+    return metric if target == LOCAL_TARGET else f"{target}/{metric}"
+
+
+@dataclass
+class DetectionResult:
+    targets: List[str]
+    metrics: List[str]
+    values: np.ndarray
+    breached: np.ndarray
+    sustained: np.ndarray
+    durations: np.ndarray
+    opened: List[Tuple[str, str]]
+    cleared: List[Tuple[str, str]]
+
+    @cached_property
+    def positions(self) -> Dict[str, int]:
+        return {target: row for row, target in enumerate(self.targets)}
+
+    def _row(self, target: str) -> int:
+        return self.positions[target]
+
+    def issues(self, target: str = LOCAL_TARGET) -> List[str]:
+        row = self._row(target)
+        return [metric for metric, flag in zip(self.metrics, self.sustained[row]) if flag]
+
+    def tracking(self, target: str = LOCAL_TARGET) -> List[str]:
+        row = self._row(target)
+        pending = self.breached[row] & ~self.sustained[row]
+        return [metric for metric, flag in zip(self.metrics, pending) if flag]
+
+    def duration(self, metric: str, target: str = LOCAL_TARGET) -> int:
+        return int(self.durations[self._row(target), self.metrics.index(metric)])
+
+    def sustained_cells(self) -> List[Tuple[str, str]]:
+        rows, columns = np.nonzero(self.sustained)
+        return [(self.targets[row], self.metrics[column]) for row, column in zip(rows, columns)]
+
+
+class DetectionEngine:
+    def __init__(self, definitions=METRIC_DEFINITIONS, spike_duration=SPIKE_DURATION_SECONDS, tracker=None,
+                 stale_after=FLEET_TARGET_STALE_SECONDS):
+        self.metrics = [definition.name for definition in definitions]
+        self.metric_index = {name: column for column, name in enumerate(self.metrics)}
+        self.thresholds = np.array([definition.threshold for definition in definitions], dtype=float)
+        self.spike_duration = spike_duration
+        self.tracker = tracker
+        self.targets = []
+        self.target_index = {}
+        self.spike_start = np.full((0, len(self.metrics)), np.nan)
+        self.last_seen = np.zeros(0)
+        self.stale_after = stale_after
+        self.last_targets = None
+        self.last_rows = None
+
+    def rows(self, targets: Sequence[str]) -> np.ndarray:
+        if self.last_targets is not None and targets == self.last_targets:
+            return self.last_rows
+        new_targets = [target for target in targets if target not in self.target_index]
+        if new_targets:
+            starts = np.full((len(new_targets), len(self.metrics)), np.nan)
+            if self.tracker is not None:
+                with self.tracker.lock:
+                    for row, target in enumerate(new_targets):
+                        for column, metric in enumerate(self.metrics):
+                            started = self.tracker.spike_times.get(spike_key(target, metric))
+                            if isinstance(started, (int, float)):
+                                starts[row, column] = started
+            for target in new_targets:
+                self.target_index[target] = len(self.targets)
+                self.targets.append(target)
+            self.spike_start = np.vstack([self.spike_start, starts])
+            self.last_seen = np.concatenate([self.last_seen, np.full(len(new_targets), np.inf)])
+        self.last_targets = list(targets)
+        self.last_rows = np.fromiter((self.target_index[target] for target in targets), dtype=np.intp, count=len(targets))
+        return self.last_rows
+
+    def matrix(self, values_by_metric: Dict[str, Dict[str, float]], targets: Sequence[str]) -> np.ndarray:
+        values = np.full((len(targets), len(self.metrics)), np.nan)
+        positions = {target: row for row, target in enumerate(targets)}
+        for metric, by_target in values_by_metric.items():
+            column = self.metric_index.get(metric)
+            if column is None:
+                continue
+            for target, value in by_target.items():
+                row = positions.get(target)
+                if row is not None:
+                    values[row, column] = value
+        return values
+
+    def evaluate(self, values: np.ndarray, targets: Sequence[str], now: Optional[float] = None,
+                 thresholds: Optional[np.ndarray] = None) -> DetectionResult:
+        now = time.time() if now is None else now
+        thresholds = self.thresholds if thresholds is None else thresholds
+        rows = self.rows(targets)
+        self.last_seen[rows] = now
+        self.prune(now)
+        rows = self.rows(targets)
+        starts = self.spike_start[rows]
+
+        observed = ~np.isnan(values)
+        breached = observed & (values > thresholds)
+        active = ~np.isnan(starts)
+        opened = breached & ~active
+        cleared = observed & ~breached & active
+
+        starts[opened] = now
+        starts[cleared] = np.nan
+        self.spike_start[rows] = starts
+
+        durations = np.where(breached, now - starts, 0.0)
+        sustained = breached & (durations >= self.spike_duration)
+
+        opened_cells = [(targets[row], self.metrics[column]) for row, column in zip(*np.nonzero(opened))]
+        cleared_cells = [(targets[row], self.metrics[column]) for row, column in zip(*np.nonzero(cleared))]
+        if opened_cells or cleared_cells:
+            observe_spikes(opened_cells, cleared_cells)
+            if self.tracker is not None:
+                self.tracker.update(
+                    {spike_key(target, metric): now for target, metric in opened_cells},
+                    [spike_key(target, metric) for target, metric in cleared_cells]
+                )
+
+        return DetectionResult(
+            targets=list(targets),
+            metrics=self.metrics,
+            values=values,
+            breached=breached,
+            sustained=sustained,
+            durations=durations,
+            opened=opened_cells,
+            cleared=cleared_cells
+        )
+
+    def evaluate_target(self, values: Dict[str, float], target: str = LOCAL_TARGET, now: Optional[float] = None,
+                        thresholds: Optional[Dict[str, float]] = None) -> DetectionResult:
+        row = np.full((1, len(self.metrics)), np.nan)
+        for metric, value in values.items():
+            row[0, self.metric_index[metric]] = value
+        threshold_row = None
+        if thresholds:
+            threshold_row = self.thresholds.copy()
+            for metric, threshold in thresholds.items():
+                threshold_row[self.metric_index[metric]] = threshold
+        return self.evaluate(row, [target], now, threshold_row)
+
+    def prune(self, now: float):
+        if self.stale_after is None:
+            return
+        stale = self.last_seen < now - self.stale_after
+        if not stale.any():
+            return
+        keep = ~stale
+        stale_keys = [
+            spike_key(self.targets[row], self.metrics[column])
+            for row, column in zip(*np.nonzero(stale[:, None] & ~np.isnan(self.spike_start)))
+        ]
+        self.targets = [target for target, kept in zip(self.targets, keep) if kept]
+        self.target_index = {target: row for row, target in enumerate(self.targets)}
+        self.spike_start = self.spike_start[keep]
+        self.last_seen = self.last_seen[keep]
+        self.last_targets = None
+        self.last_rows = None
+        if stale_keys and self.tracker is not None:
+            self.tracker.update({}, stale_keys)
+
+    def active_spikes(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.spike_start)))
@@ -0,0 +1,118 @@
+import time
+from concurrent.futures import wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import PROMETHEUS_URL, PROMETHEUS_QUERY_TIMEOUT_SECONDS, FLEET_SPIKE_TRACKING_FILE
+from metrics_collector import PrometheusCollector, METRIC_DEFINITIONS, METRICS
+from detection import DetectionEngine
+from spike_tracker import SpikeTracker
+from tracing import span
+
+FLEET_QUERIES = {definition.name: definition.fleet_query for definition in METRIC_DEFINITIONS}
+
+
+@dataclass
+class FleetSnapshot:
+    values: Dict[str, Dict[str, float]]
+    errors: Dict[str, str] = field(default_factory=dict)
+    collected_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+
+    def instances(self) -> List[str]:
+        return sorted({instance for by_instance in self.values.values() for instance in by_instance})
+
+    def metrics_for(self, instance: str) -> Dict[str, str]:
+        return {
+            name: f"{by_instance[instance]:.2f}{METRICS[name].unit}"
+            for name, by_instance in self.values.items() if instance in by_instance
+        }
+
+
+@dataclass
+class FleetIssue:
+    instance: str
+    metric: str
+    value: float
+    duration: int
+
+
+@dataclass
+class FleetEvaluation:
+    sustained: List[FleetIssue]
+    cleared: List[Tuple[str, str]]
+    tracking: int
+    targets: int
+    duration: float = 0.0
+
+    def by_instance(self) -> Dict[str, List[FleetIssue]]:
+        grouped = {}
+        for issue in self.sustained:
+            grouped.setdefault(issue.instance, []).append(issue)
+        return grouped
+
+
+class FleetCollector(PrometheusCollector):
+    def __init__(self, base_url=PROMETHEUS_URL, timeout=PROMETHEUS_QUERY_TIMEOUT_SECONDS, queries=None):
+        super().__init__(base_url, timeout, queries or FLEET_QUERIES)
+
+    def query_vector(self, name: str, deadline: float) -> Dict[str, float]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("deadline exceeded before query was sent")
+        response = self.session.get(
+            f"{self.base_url}/api/v1/query",
+            params={'query': self.queries[name]},
+            timeout=remaining
+        )
+        return {
+            series['metric'].get('instance', ''): float(series['value'][1])
+            for series in response.json()['data']['result']
+        }
+
+    def collect(self, names: Optional[Iterable[str]] = None) -> FleetSnapshot:
+        with span('prometheus.fleet_collect'):
+            names = list(names or self.queries)
+            started = time.monotonic()
+            deadline = started + self.timeout
+            futures = {self.executor.submit(self.query_vector, name, deadline): name for name in names}
+            done, _ = wait(futures, timeout=self.timeout)
+
+            values, errors = {}, {}
+            for future, name in futures.items():
+                if future not in done:
+                    future.cancel()
+                    errors[name] = f"query timed out after {self.timeout}s"
+                elif future.exception():
+                    errors[name] = str(future.exception())
+                else:
+                    values[name] = future.result()
+
+            return FleetSnapshot(values, errors, duration=time.monotonic() - started)
+
+
+class FleetMonitor:
+    def __init__(self, collector=None, tracker=None, engine=None):
+        self.collector = collector or FleetCollector()
+        self.tracker = tracker or SpikeTracker(FLEET_SPIKE_TRACKING_FILE)
+        self.engine = engine or DetectionEngine(tracker=self.tracker)
+
+    def evaluate(self, snapshot: Optional[FleetSnapshot] = None, now: Optional[float] = None) -> FleetEvaluation:
+        snapshot = snapshot or self.collector.collect()
+        started = time.perf_counter()
+
+        targets = snapshot.instances()
+        values = self.engine.matrix(snapshot.values, targets)
+        result = self.engine.evaluate(values, targets, now)
+
+        sustained = [
+            FleetIssue(instance, metric, snapshot.values[metric][instance], result.duration(metric, instance))
+            for instance, metric in result.sustained_cells()
+        ]
+
+        return FleetEvaluation(
+            sustained=sustained,
+            cleared=result.cleared,
+            tracking=self.engine.active_spikes(),
+            targets=len(targets),
+            duration=time.perf_counter() - started
+        )
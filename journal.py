@@ -0,0 +1,150 @@
+import json
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+from config import (
+    JOURNAL_SINCE, JOURNAL_PRIORITY, JOURNAL_UNITS, JOURNAL_MAX_ENTRIES,
+    JOURNAL_EXCERPT_LINES, JOURNAL_TIMEOUT_SECONDS, JOURNAL_CACHE_SECONDS
+)
+from log_templates import TemplateMiner
+from tracing import span
+
+
+@dataclass
+class JournalExcerpt:
+    lines: List[str] = field(default_factory=list)
+    entries: int = 0
+    patterns: int = 0
+    truncated: bool = False
+    error: Optional[str] = None
+    collected_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+    def summary(self) -> str:
+        if self.error:
+            return f"Error retrieving logs: {self.error}"
+        truncated = " (truncated)" if self.truncated else ""
+        return f"Recent logs retrieved: {self.entries} entries{truncated}, {self.patterns} distinct patterns"
+
+
+def parse_entry(line: str) -> Optional[Dict]:
+    try:
+        entry = json.loads(line)
+    except:
+        return None
+    message = entry.get('MESSAGE')
+    if isinstance(message, list):
+        try:
+            message = bytes(message).decode('utf-8', 'replace')
+        except:
+            return None
+    if not isinstance(message, str) or not message.strip():
+        return None
+    try:
+        priority = min(int(entry.get('PRIORITY', 6)), 7)
+    except:
+        priority = 6
+    try:
+        timestamp = int(entry['__REALTIME_TIMESTAMP']) / 1e6
+    except:
+        timestamp = time.time()
+    unit = entry.get('_SYSTEMD_UNIT') or entry.get('SYSLOG_IDENTIFIER') or entry.get('_COMM') or 'kernel'
+    return {'unit': unit, 'message': message.strip(), 'priority': priority, 'timestamp': timestamp}
+
+
+class JournalCollector:
+    def __init__(self, since=JOURNAL_SINCE, priority=JOURNAL_PRIORITY, units: Sequence[str] = JOURNAL_UNITS,
+                 max_entries=JOURNAL_MAX_ENTRIES,
+                 excerpt_lines=JOURNAL_EXCERPT_LINES, timeout=JOURNAL_TIMEOUT_SECONDS,
+                 cache_seconds=JOURNAL_CACHE_SECONDS):
+        self.since = since
+        self.priority = priority
+        self.units = list(units)
+        self.max_entries = max_entries
+        self.excerpt_lines = excerpt_lines
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self.lock = threading.RLock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='journal')
+        self.pending: Optional[Future] = None
+        self.cached: Optional[JournalExcerpt] = None
+
+    def command(self) -> List[str]:
+        command = ['journalctl', '--since', self.since, '--no-pager', '-o', 'json']
+        if self.priority:
+            command += ['--priority', self.priority]
+        for unit in self.units:
+            command += ['--unit', unit]
+        return command
+
+    def stream_entries(self) -> Iterator[Dict]:
+        deadline = time.monotonic() + self.timeout
+        process = subprocess.Popen(self.command(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                   text=True, encoding='utf-8', errors='replace')
+        try:
+            for line in process.stdout:
+                entry = parse_entry(line)
+                if entry:
+                    yield entry
+                if time.monotonic() > deadline:
+                    break
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+    def collect(self) -> JournalExcerpt:
+        started = time.monotonic()
+        excerpt = JournalExcerpt()
+        miner = TemplateMiner()
+        try:
+            for entry in self.stream_entries():
+                if excerpt.entries >= self.max_entries:
+                    excerpt.truncated = True
+                    break
+                excerpt.entries += 1
+                miner.add(entry['message'], entry['unit'], entry['priority'], entry['timestamp'])
+        except Exception as e:
+            excerpt.error = str(e)
+
+        excerpt.lines = miner.summary(self.excerpt_lines)
+        excerpt.patterns = len(miner.clusters)
+        excerpt.duration = time.monotonic() - started
+        return excerpt
+
+    def _store(self, future: Future):
+        with self.lock:
+            if self.pending is future:
+                self.pending = None
+                if not future.exception():
+                    self.cached = future.result()
+
+    def prefetch(self) -> Future:
+        with self.lock:
+            if self.cached and time.time() - self.cached.collected_at < self.cache_seconds:
+                future = Future()
+                future.set_result(self.cached)
+                return future
+            if self.pending is None:
+                self.pending = self.executor.submit(self.collect)
+                self.pending.add_done_callback(self._store)
+            return self.pending
+
+    def excerpt(self) -> JournalExcerpt:
+        with span('journal.excerpt'):
+            return self.prefetch().result()
+
+    def invalidate(self):
+        with self.lock:
+            self.cached = None
+
+
+journal_collector = JournalCollector()
@@ -0,0 +1,539 @@
+import argparse
+import ipaddress
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional, Sequence
+import psutil
+from config import (
+    SPIKE_DURATION_SECONDS, LOAD_TICK_SECONDS, LOAD_CPU_PERIOD_SECONDS, LOAD_MAX_MEMORY_PERCENT, LOAD_MEMORY_CHUNK_MB,
+    LOAD_DISK_MIN_FREE_MB, LOAD_DISK_WRITE_MB_PER_TICK, LOAD_NETWORK_CHUNK_BYTES
+)
+from metrics_collector import METRICS
+
+MB = 1024 * 1024
+
+
+def _burn(level, stop, period):
+    while not stop.is_set():
+        started = time.perf_counter()
+        busy = period * min(max(level.value, 0.0), 100.0) / 100
+        while time.perf_counter() - started < busy:
+            pass
+        stop.wait(max(period - (time.perf_counter() - started), 0.0))
+
+
+class CpuLoad:
+    def __init__(self, workers: Optional[int] = None, period=LOAD_CPU_PERIOD_SECONDS):
+        self.workers = workers or os.cpu_count() or 1
+        self.period = period
+        self.level = multiprocessing.Value('d', 0.0, lock=False)
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+
+    def set_level(self, percent: float):
+        self.level.value = percent
+        if percent > 0 and not self.processes:
+            self.processes = [
+                multiprocessing.Process(target=_burn, args=(self.level, self.stop_event, self.period), daemon=True)
+                for _ in range(self.workers)
+            ]
+            for process in self.processes:
+                process.start()
+
+    def measure(self) -> Optional[float]:
+        return None
+
+    def close(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+
+class MemoryLoad:
+    def __init__(self, max_percent=LOAD_MAX_MEMORY_PERCENT, chunk_mb=LOAD_MEMORY_CHUNK_MB):
+        self.max_percent = max_percent
+        self.chunk = chunk_mb * MB
+        self.chunks: List[bytes] = []
+
+    def set_level(self, percent: float):
+        memory = psutil.virtual_memory()
+        target = min(percent, self.max_percent) / 100 * memory.total
+        delta = target - (memory.total - memory.available)
+        while delta >= self.chunk:
+            self.chunks.append(b'\x01' * self.chunk)
+            delta -= self.chunk
+        while delta <= -self.chunk and self.chunks:
+            self.chunks.pop()
+            delta += self.chunk
+
+    def measure(self) -> Optional[float]:
+        return psutil.virtual_memory().percent
+
+    def close(self):
+        self.chunks = []
+
+
+class DiskLoad:
+    def __init__(self, directory: Optional[str] = None, min_free_mb=LOAD_DISK_MIN_FREE_MB,
+                 write_mb_per_tick=LOAD_DISK_WRITE_MB_PER_TICK, chunk_mb=64):
+        self.path = tempfile.mkdtemp(prefix='devops_load_', dir=directory)
+        self.min_free = min_free_mb * MB
+        self.write_limit = write_mb_per_tick * MB
+        self.chunk = chunk_mb * MB
+        self.block = os.urandom(MB)
+        self.files: List[str] = []
+
+    def set_level(self, percent: float):
+        usage = psutil.disk_usage(self.path)
+        capacity = usage.used + usage.free
+        delta = min(percent / 100 * capacity - usage.used, usage.free - self.min_free, self.write_limit)
+        while delta >= MB:
+            size = min(self.chunk, int(delta) // MB * MB)
+            path = os.path.join(self.path, f"fill-{len(self.files):05d}")
+            with open(path, 'wb') as f:
+                for _ in range(size // MB):
+                    f.write(self.block)
+                f.flush()
+                os.fsync(f.fileno())
+            self.files.append(path)
+            delta -= size
+        while delta <= -self.chunk and self.files:
+            os.unlink(self.files.pop())
+            delta += self.chunk
+
+    def measure(self) -> Optional[float]:
+        return psutil.disk_usage(self.path).percent
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.files = []
+
+
+class NetworkLoad:
+    def __init__(self, host='127.0.0.1', port=0, chunk_bytes=LOAD_NETWORK_CHUNK_BYTES):
+        self.host = host
+        self.port = port
+        self.payload = os.urandom(chunk_bytes)
+        self.mbps = 0.0
+        self.sent = 0
+        self.measured = (0, time.monotonic())
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.sink = None
+
+    def _drain(self):
+        self.sink.settimeout(0.5)
+        while not self.stop_event.is_set():
+            try:
+                connection, _ = self.sink.accept()
+            except socket.timeout:
+                continue
+            with connection:
+                while connection.recv(1 << 20):
+                    pass
+
+    def _send(self):
+        with socket.create_connection((self.host, self.port)) as connection:
+            budget, last = 0.0, time.monotonic()
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                budget = min(budget + self.mbps * 1e6 / 8 * (now - last), len(self.payload) * 16)
+                last = now
+                if budget < len(self.payload):
+                    time.sleep(0.001 if self.mbps else 0.05)
+                    continue
+                connection.sendall(self.payload)
+                self.sent += len(self.payload)
+                budget -= len(self.payload)
+
+    def start(self):
+        if self.port == 0:
+            self.sink = socket.create_server((self.host, 0))
+            self.port = self.sink.getsockname()[1]
+            self.threads.append(threading.Thread(target=self._drain, name='load-network-sink', daemon=True))
+        self.threads.append(threading.Thread(target=self._send, name='load-network-send', daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def set_level(self, mbps: float):
+        self.mbps = max(mbps, 0.0)
+        if self.mbps and not self.threads:
+            self.start()
+
+    def measure(self) -> Optional[float]:
+        sent, now = self.sent, time.monotonic()
+        previous, since = self.measured
+        self.measured = (sent, now)
+        return (sent - previous) * 8 / 1e6 / (now - since) if now > since else 0.0
+
+    def close(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=2)
+        if self.sink is not None:
+            self.sink.close()
+        self.threads = []
+
+
+CONTROLLERS = {'cpu': CpuLoad, 'memory': MemoryLoad, 'disk': DiskLoad, 'network': NetworkLoad}
+
+
+def ramp(start: float, end: float, seconds: float) -> Callable[[float], float]:
+    return lambda t: start + (end - start) * min(t / seconds, 1.0) if seconds > 0 else end
+
+
+def leak_curve(start: float, end: float, seconds: float, exponent=1.5) -> Callable[[float], float]:
+    return lambda t: start + (end - start) * min(t / seconds, 1.0) ** exponent if seconds > 0 else end
+
+
+def flap(high: float, low: float, period: float, high_fraction=0.5) -> Callable[[float], float]:
+    return lambda t: high if (t % period) < period * high_fraction else low
+
+
+@dataclass
+class LoadScenario:
+    name: str
+    metric: str
+    profile: Callable[[float], float]
+    duration: float
+    start: float = 0.0
+    options: Dict = field(default_factory=dict)
+    scored: bool = True
+
+    @property
+    def threshold(self) -> float:
+        return METRICS[self.metric].threshold
+
+
+def cpu_ramp(peak=95.0, ramp_seconds=60.0, hold=60.0, start=0.0, workers=None) -> LoadScenario:
+    return LoadScenario('cpu_ramp', 'cpu', ramp(0.0, peak, ramp_seconds), ramp_seconds + hold, start,
+                        {'workers': int(workers) if workers else None})
+
+
+def memory_leak(target=90.0, leak_seconds=120.0, hold=30.0, exponent=1.5, start=0.0) -> LoadScenario:
+    baseline = psutil.virtual_memory().percent
+    return LoadScenario('memory_leak', 'memory', leak_curve(baseline, target, leak_seconds, exponent),
+                        leak_seconds + hold, start)
+
+
+def disk_fill(target=None, fill_seconds=60.0, hold=60.0, directory=None, start=0.0) -> LoadScenario:
+    target = METRICS['disk'].threshold + 5 if target is None else target
+    baseline = psutil.disk_usage(directory or tempfile.gettempdir()).percent
+    return LoadScenario('disk_fill', 'disk', ramp(baseline, target, fill_seconds), fill_seconds + hold, start,
+                        {'directory': directory})
+
+
+def is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def network_flood(mbps=None, duration=60.0, host='127.0.0.1', port=0, start=0.0) -> LoadScenario:
+    # Loopback traffic only appears on lo, which neither the ens5 query nor the fleet query watches.
+    # Its breach windows come from the generator's own measured send rate and are left out of scoring.
+    mbps = METRICS['network'].threshold * 1.5 if mbps is None else mbps
+    return LoadScenario('network_flood', 'network', lambda t: mbps, duration, start, {'host': host, 'port': int(port)},
+                        scored=not is_loopback(host))
+
+
+def flapping(metric='cpu', margin=10.0, period=None, cycles=5, high_fraction=0.5, start=0.0) -> LoadScenario:
+    threshold = METRICS[metric].threshold
+    period = SPIKE_DURATION_SECONDS if period is None else period
+    return LoadScenario(f'{metric}_flapping', metric, flap(threshold + margin, threshold - margin, period, high_fraction),
+                        period * cycles, start)
+
+
+SCENARIOS = {
+    'cpu_ramp': cpu_ramp,
+    'memory_leak': memory_leak,
+    'disk_fill': disk_fill,
+    'network_flood': network_flood,
+    'flapping': flapping,
+}
+
+
+@dataclass
+class GroundTruthEvent:
+    timestamp: float
+    scenario: str
+    metric: str
+    event: str
+    value: float
+
+
+@dataclass
+class BreachWindow:
+    scenario: str
+    metric: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class LoadGenerator:
+    def __init__(self, scenarios: Sequence[LoadScenario], tick=LOAD_TICK_SECONDS):
+        self.scenarios = list(scenarios)
+        self.tick = tick
+        self.events: List[GroundTruthEvent] = []
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def duration(self) -> float:
+        return max((scenario.start + scenario.duration for scenario in self.scenarios), default=0.0)
+
+    def record(self, scenario: LoadScenario, event: str, value: float):
+        self.events.append(GroundTruthEvent(time.time(), scenario.name, scenario.metric, event, round(value, 2)))
+
+    def run(self):
+        controllers = {}
+        above = {}
+        started = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                elapsed = time.monotonic() - started
+                if elapsed >= self.duration:
+                    break
+                for index, scenario in enumerate(self.scenarios):
+                    offset = elapsed - scenario.start
+                    if offset < 0 or index in above and above[index] is None:
+                        continue
+                    if offset >= scenario.duration:
+                        if index in controllers:
+                            self._finish(scenario, controllers.pop(index), above[index])
+                        else:
+                            self.record(scenario, 'skipped', 0.0)
+                        above[index] = None
+                        continue
+                    if index not in controllers:
+                        controllers[index] = CONTROLLERS[scenario.metric](**{
+                            key: value for key, value in scenario.options.items() if value is not None
+                        })
+                        self.record(scenario, 'start', 0.0)
+                        above[index] = False
+                    level = scenario.profile(offset)
+                    controllers[index].set_level(level)
+                    measured = controllers[index].measure()
+                    value = level if measured is None else measured
+                    breached = value > scenario.threshold
+                    if breached != above[index]:
+                        self.record(scenario, 'breach' if breached else 'recover', value)
+                        above[index] = breached
+                self.stop_event.wait(self.tick)
+        finally:
+            for index, controller in controllers.items():
+                self._finish(self.scenarios[index], controller, above.get(index))
+        return self.events
+
+    def _finish(self, scenario: LoadScenario, controller, breached: Optional[bool]):
+        controller.close()
+        if breached:
+            self.record(scenario, 'recover', 0.0)
+        self.record(scenario, 'stop', 0.0)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='load-generator', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+
+    def windows(self, scored_only=True) -> List[BreachWindow]:
+        unscored = {scenario.name for scenario in self.scenarios if not scenario.scored} if scored_only else set()
+        windows, open_breaches = [], {}
+        for event in self.events:
+            if event.scenario in unscored:
+                continue
+            key = (event.scenario, event.metric)
+            if event.event == 'breach':
+                open_breaches[key] = event.timestamp
+            elif event.event == 'recover' and key in open_breaches:
+                windows.append(BreachWindow(event.scenario, event.metric, open_breaches.pop(key), event.timestamp))
+        now = time.time()
+        windows.extend(BreachWindow(scenario, metric, start, now) for (scenario, metric), start in open_breaches.items())
+        return windows
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            for event in self.events:
+                f.write(json.dumps(asdict(event)) + '\n')
+
+
+class DetectionProbe:
+    def __init__(self, metrics: Sequence[str], interval=5.0, spike_duration=SPIKE_DURATION_SECONDS, prometheus_url=None):
+        from detection import DetectionEngine
+        from metrics_collector import PrometheusCollector
+        self.metrics = set(metrics)
+        self.interval = interval
+        self.collector = PrometheusCollector(prometheus_url) if prometheus_url else PrometheusCollector()
+        self.engine = DetectionEngine(spike_duration=spike_duration)
+        self.detections = []
+        self.active = set()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def poll(self):
+        from metrics_collector import collect_psutil_snapshot
+        snapshot = self.collector.collect()
+        if snapshot.failed():
+            snapshot = collect_psutil_snapshot()
+        issues = set(self.engine.evaluate_target(snapshot.observed()).issues()) & self.metrics
+        now = time.time()
+        for metric in issues - self.active:
+            self.detections.append((now, metric))
+        self.active = issues
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Detection probe error: {e}", file=sys.stderr)
+            self.stop_event.wait(self.interval)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='detection-probe', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+def score(windows: Sequence[BreachWindow], detections: Sequence[tuple], sustain=SPIKE_DURATION_SECONDS,
+          grace=30.0) -> Dict:
+    positives = [window for window in windows if window.duration >= sustain]
+    negatives = [window for window in windows if window.duration < sustain]
+    matched = set()
+    latencies, missed = [], []
+    for window in positives:
+        hits = [
+            index for index, (timestamp, metric) in enumerate(detections)
+            if metric == window.metric and window.start <= timestamp <= window.end + grace
+        ]
+        if hits:
+            latencies.append(round(detections[hits[0]][0] - window.start, 2))
+            matched.update(hits)
+        else:
+            missed.append(window.scenario)
+
+    alerted_negatives = 0
+    for window in negatives:
+        hits = [
+            index for index, (timestamp, metric) in enumerate(detections)
+            if metric == window.metric and window.start <= timestamp <= window.end + grace
+        ]
+        if hits:
+            alerted_negatives += 1
+            matched.update(hits)
+    spurious = len(detections) - len(matched)
+    return {
+        'sustained_breaches': len(positives),
+        'detected': len(latencies),
+        'missed': missed,
+        'detection_latency_s': latencies,
+        'short_breaches': len(negatives),
+        'short_breaches_alerted': alerted_negatives,
+        'false_positive_rate': round(alerted_negatives / len(negatives), 3) if negatives else 0.0,
+        'spurious_detections': spurious
+    }
+
+
+def parse_scenario(spec: str) -> LoadScenario:
+    name, _, arguments = spec.partition(':')
+    if name not in SCENARIOS:
+        raise argparse.ArgumentTypeError(f"unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+    options = {}
+    for argument in filter(None, arguments.split(',')):
+        key, _, value = argument.partition('=')
+        try:
+            options[key] = float(value)
+        except ValueError:
+            options[key] = value
+    try:
+        return SCENARIOS[name](**options)
+    except TypeError as e:
+        raise argparse.ArgumentTypeError(f"{spec}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate host load with ground-truth breach timestamps",
+        epilog="Scenarios take name[:key=value,...], e.g. cpu_ramp:peak=95,ramp_seconds=30 flapping:metric=memory,cycles=4"
+    )
+    parser.add_argument('scenarios', nargs='+', type=parse_scenario, help=f"scenarios to run ({', '.join(SCENARIOS)})")
+    parser.add_argument('--sequential', action='store_true', help="run scenarios one after another instead of together")
+    parser.add_argument('--tick', type=float, default=LOAD_TICK_SECONDS)
+    parser.add_argument('--truth', help="write ground-truth events as JSON lines")
+    parser.add_argument('--probe', action='store_true', help="run the detection engine alongside and score it")
+    parser.add_argument('--probe-interval', type=float, default=5.0)
+    parser.add_argument('--sustain', type=float, default=SPIKE_DURATION_SECONDS)
+    parser.add_argument('--prometheus-url')
+    parser.add_argument('--report', help="write the detection score as JSON")
+    args = parser.parse_args(argv)
+
+    if args.sequential:
+        offset = 0.0
+        for scenario in args.scenarios:
+            scenario.start = offset
+            offset += scenario.duration
+
+    generator = LoadGenerator(args.scenarios, tick=args.tick)
+    probe = None
+    if args.probe:
+        for scenario in args.scenarios:
+            if not scenario.scored:
+                print(f"{scenario.name}: loopback traffic is invisible to the monitored interfaces, not scoring it "
+                      f"(pass host=<remote sink> to flood a monitored NIC)")
+        probe = DetectionProbe({scenario.metric for scenario in args.scenarios if scenario.scored}, args.probe_interval, args.sustain,
+                               args.prometheus_url).start()
+    print(f"Running {', '.join(scenario.name for scenario in args.scenarios)} for {generator.duration:.0f}s")
+    generator.start()
+    try:
+        generator.wait()
+    except KeyboardInterrupt:
+        print("Load generation interrupted")
+    finally:
+        generator.stop()
+        if probe:
+            probe.stop()
+
+    for event in generator.events:
+        print(f"{time.strftime('%H:%M:%S', time.localtime(event.timestamp))} {event.scenario:<16} {event.event:<8} {event.value}")
+    if args.truth:
+        generator.save(args.truth)
+    if probe:
+        result = score(generator.windows(), probe.detections, args.sustain)
+        print(json.dumps(result, indent=2))
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
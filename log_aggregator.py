@@ -1,16 +1,30 @@
 import json
 import glob
 import os
+import sqlite3
+from collections import Counter
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
+from log_index import LogIndex, BUCKET_SECONDS, merge_ranges, parse_timestamp, to_epoch
+
+READ_BLOCK_SIZE = 64 * 1024
 
 class LogAggregator:
     def __init__(self, log_dir="logs"):
         self.log_dir = log_dir
+        try:
+            self.index = LogIndex(log_dir)
+        except (sqlite3.Error, OSError):
+            self.index = None
         
     def get_log_files(self) -> List[str]:
         pattern = os.path.join(self.log_dir, "devops-agent.log*")
-        return sorted(glob.glob(pattern), reverse=True)
+        return sorted(glob.glob(pattern), key=self.rotation_number)
+    
+    def rotation_number(self, log_file: str) -> int:
+        suffix = log_file.rsplit('.log', 1)[-1].lstrip('.')
+        return int(suffix) if suffix.isdigit() else 0
     
     def parse_log_line(self, line: str) -> Optional[Dict]:
         try:
@@ -18,39 +32,91 @@ class LogAggregator:
         except:
             return None
     
-    def search_logs(self, 
-                   start_time: Optional[datetime] = None,
-                   end_time: Optional[datetime] = None,
-                   level: Optional[str] = None,
-                   alert_type: Optional[str] = None,
-                   search_text: Optional[str] = None,
-                   limit: int = 1000) -> List[Dict]:
+    def read_entries(self, log_file: str, start: int = 0, end: Optional[int] = None) -> Iterator[Dict]:
+        with open(log_file, 'rb') as f:
+            f.seek(start)
+            position = start
+            for line in f:
+                if end is not None and position >= end:
+                    break
+                position += len(line)
+                log_entry = self.parse_log_line(line)
+                if log_entry:
+                    yield log_entry
+    
+    def read_entries_reversed(self, log_file: str, start: int = 0, end: Optional[int] = None) -> Iterator[Dict]:
+        with open(log_file, 'rb') as f:
+            if end is None:
+                end = f.seek(0, os.SEEK_END)
+            position = end
+            remainder = b''
+            while position > start:
+                read_size = min(READ_BLOCK_SIZE, position - start)
+                position -= read_size
+                f.seek(position)
+                lines = (f.read(read_size) + remainder).split(b'\n')
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    log_entry = self.parse_log_line(line)
+                    if log_entry:
+                        yield log_entry
+            log_entry = self.parse_log_line(remainder)
+            if log_entry:
+                yield log_entry
+    
+    def file_span(self, log_file: str) -> Tuple[Optional[float], Optional[float]]:
+        first = next(self.read_entries(log_file), None)
+        last = next(self.read_entries_reversed(log_file), None)
+        return (
+            parse_timestamp(first.get('timestamp', '')) if first else None,
+            parse_timestamp(last.get('timestamp', '')) if last else None
+        )
+    
+    def file_ranges(self, start_time, end_time, level, alert_type) -> List[Tuple[str, List[Tuple[int, Optional[int]]]]]:
+        log_files = self.get_log_files()
+        if self.index:
+            try:
+                self.index.refresh(log_files)
+                ranges = self.index.ranges(start_time, end_time, level, alert_type)
+                return [(log_file, ranges[log_file][::-1]) for log_file in log_files if log_file in ranges]
+            except sqlite3.Error:
+                pass
         
-        results = []
-        count = 0
+        start_ts, end_ts = to_epoch(start_time), to_epoch(end_time)
+        file_ranges = []
+        for log_file in log_files:
+            if start_ts is not None or end_ts is not None:
+                try:
+                    first_ts, last_ts = self.file_span(log_file)
+                except OSError:
+                    continue
+                if start_ts is not None and last_ts is not None and last_ts < start_ts:
+                    continue
+                if end_ts is not None and first_ts is not None and first_ts > end_ts:
+                    continue
+            file_ranges.append((log_file, [(0, None)]))
+        return file_ranges
+    
+    def stream_logs(self,
+                    start_time: Optional[datetime] = None,
+                    end_time: Optional[datetime] = None,
+                    level: Optional[str] = None,
+                    alert_type: Optional[str] = None,
+                    search_text: Optional[str] = None) -> Iterator[Dict]:
+        start_ts, end_ts = to_epoch(start_time), to_epoch(end_time)
+        search_text = search_text.lower() if search_text else None
         
-        for log_file in self.get_log_files():
-            if count >= limit:
-                break
-                
+        for log_file, ranges in self.file_ranges(start_time, end_time, level, alert_type):
             try:
-                with open(log_file, 'r') as f:
-                    for line in f:
-                        if count >= limit:
-                            break
-                            
-                        log_entry = self.parse_log_line(line)
-                        if not log_entry:
-                            continue
-                        
-                        if start_time:
-                            log_time = datetime.fromisoformat(log_entry['timestamp'].replace('Z', '+00:00'))
-                            if log_time < start_time:
+                for start, end in ranges:
+                    for log_entry in self.read_entries_reversed(log_file, start, end):
+                        if start_ts is not None or end_ts is not None:
+                            log_time = parse_timestamp(log_entry.get('timestamp', ''))
+                            if log_time is None:
                                 continue
-                        
-                        if end_time:
-                            log_time = datetime.fromisoformat(log_entry['timestamp'].replace('Z', '+00:00'))
-                            if log_time > end_time:
+                            if start_ts is not None and log_time < start_ts:
+                                return
+                            if end_ts is not None and log_time > end_ts:
                                 continue
                         
                         if level and log_entry.get('level') != level:
@@ -59,15 +125,88 @@ class LogAggregator:
                         if alert_type and log_entry.get('alert_type') != alert_type:
                             continue
                             
-                        if search_text and search_text.lower() not in log_entry.get('message', '').lower():
+                        if search_text and search_text not in log_entry.get('message', '').lower():
                             continue
                         
-                        results.append(log_entry)
-                        count += 1
-            except Exception as e:
+                        yield log_entry
+            except OSError:
                 continue
+    
+    def search_logs(self, 
+                   start_time: Optional[datetime] = None,
+                   end_time: Optional[datetime] = None,
+                   level: Optional[str] = None,
+                   alert_type: Optional[str] = None,
+                   search_text: Optional[str] = None,
+                   limit: int = 1000,
+                   offset: int = 0) -> List[Dict]:
+        return list(islice(self.stream_logs(start_time, end_time, level, alert_type, search_text), offset, offset + limit))
+    
+    def aggregate(self,
+                  start_time: Optional[datetime] = None,
+                  end_time: Optional[datetime] = None,
+                  level: Optional[str] = None,
+                  alert_type: Optional[str] = None,
+                  search_text: Optional[str] = None,
+                  bucket_seconds: int = BUCKET_SECONDS) -> Dict:
+        by_level = Counter()
+        by_alert_type = Counter()
+        histogram = {}
+        
+        def add(ts, entry_level, entry_alert_type, count=1):
+            by_level[entry_level or 'UNKNOWN'] += count
+            if entry_alert_type:
+                by_alert_type[entry_alert_type] += count
+            bucket = histogram.setdefault(int(ts // bucket_seconds) * bucket_seconds, Counter())
+            bucket[entry_level or 'UNKNOWN'] += count
+        
+        rows = None
+        if self.index and not search_text and bucket_seconds % self.index.bucket_seconds == 0:
+            try:
+                self.index.refresh(self.get_log_files())
+                rows = self.index.postings(start_time, end_time, level, alert_type)
+            except sqlite3.Error:
+                rows = None
+        
+        if rows is None:
+            for log_entry in self.stream_logs(start_time, end_time, level, alert_type, search_text):
+                ts = parse_timestamp(log_entry.get('timestamp', ''))
+                if ts is not None:
+                    add(ts, log_entry.get('level'), log_entry.get('alert_type'))
+        else:
+            start_ts, end_ts = to_epoch(start_time), to_epoch(end_time)
+            partial_ranges = {}
+            partial_keys = set()
+            for path, bucket, entry_level, entry_alert_type, start, end, count, min_ts, max_ts in rows:
+                if (start_ts is None or min_ts >= start_ts) and (end_ts is None or max_ts <= end_ts):
+                    add(bucket * self.index.bucket_seconds, entry_level, entry_alert_type, count)
+                else:
+                    partial_ranges.setdefault(path, []).append((start, end))
+                    partial_keys.add((path, bucket, entry_level, entry_alert_type))
+            
+            for path, ranges in partial_ranges.items():
+                for start, end in merge_ranges(ranges):
+                    for log_entry in self.read_entries(path, start, end):
+                        ts = parse_timestamp(log_entry.get('timestamp', ''))
+                        if ts is None:
+                            continue
+                        entry_level = log_entry.get('level') or ''
+                        entry_alert_type = log_entry.get('alert_type') or ''
+                        if (path, int(ts // self.index.bucket_seconds), entry_level, entry_alert_type) not in partial_keys:
+                            continue
+                        if (start_ts is not None and ts < start_ts) or (end_ts is not None and ts > end_ts):
+                            continue
+                        add(ts, entry_level, entry_alert_type)
         
-        return results
+        return {
+            'total': sum(by_level.values()),
+            'by_level': dict(by_level),
+            'by_alert_type': dict(by_alert_type),
+            'histogram': [
+                {'time': datetime.utcfromtimestamp(bucket), 'count': sum(levels.values()), 'by_level': dict(levels)}
+                for bucket, levels in sorted(histogram.items())
+            ]
+        }
     
     def get_recent_incidents(self, hours: int = 24) -> List[Dict]:
         start_time = datetime.utcnow() - timedelta(hours=hours)
@@ -0,0 +1,195 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+INDEX_FILE = ".devops-agent.index.sqlite"
+BUCKET_SECONDS = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    inode INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    min_ts REAL,
+    max_ts REAL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    inode INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    start_offset INTEGER NOT NULL,
+    end_offset INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    min_ts REAL NOT NULL,
+    max_ts REAL NOT NULL,
+    PRIMARY KEY (inode, bucket, level, alert_type)
+);
+CREATE INDEX IF NOT EXISTS postings_time ON postings (bucket);
+"""
+
+
+def parse_timestamp(value) -> Optional[float]:
+    try:
+        ts = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def to_epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class LogIndex:
+    def __init__(self, log_dir="logs", bucket_seconds=BUCKET_SECONDS):
+        self.path = os.path.join(log_dir, INDEX_FILE)
+        self.bucket_seconds = bucket_seconds
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def refresh(self, paths: Iterable[str]):
+        with self.lock, self.conn:
+            known = {inode: (path, size) for inode, path, size in self.conn.execute("SELECT inode, path, size FROM files")}
+            seen = set()
+
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                inode = stat.st_ino
+                seen.add(inode)
+                indexed_path, offset = known.get(inode, (path, 0))
+
+                if stat.st_size < offset:
+                    self._drop(inode)
+                    offset = 0
+                if stat.st_size > offset:
+                    self._index_file(inode, path, offset)
+                elif indexed_path != path:
+                    self.conn.execute("UPDATE files SET path = ? WHERE inode = ?", (path, inode))
+
+            for inode in set(known) - seen:
+                self._drop(inode)
+
+    def _drop(self, inode):
+        self.conn.execute("DELETE FROM postings WHERE inode = ?", (inode,))
+        self.conn.execute("DELETE FROM files WHERE inode = ?", (inode,))
+
+    def _index_file(self, inode, path, offset):
+        groups = {}
+        position = offset
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                start = position
+                position += len(line)
+                try:
+                    entry = json.loads(line)
+                except:
+                    continue
+                ts = parse_timestamp(entry.get('timestamp', ''))
+                if ts is None:
+                    continue
+
+                key = (int(ts // self.bucket_seconds), entry.get('level') or '', entry.get('alert_type') or '')
+                group = groups.get(key)
+                if group is None:
+                    groups[key] = [start, position, 1, ts, ts]
+                else:
+                    group[1] = position
+                    group[2] += 1
+                    group[3] = min(group[3], ts)
+                    group[4] = max(group[4], ts)
+
+        self.conn.executemany("""
+            INSERT INTO postings (inode, bucket, level, alert_type, start_offset, end_offset, count, min_ts, max_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (inode, bucket, level, alert_type) DO UPDATE SET
+                end_offset = excluded.end_offset,
+                count = count + excluded.count,
+                min_ts = min(min_ts, excluded.min_ts),
+                max_ts = max(max_ts, excluded.max_ts)
+        """, [(inode, *key, *group) for key, group in groups.items()])
+
+        min_ts = min((group[3] for group in groups.values()), default=None)
+        max_ts = max((group[4] for group in groups.values()), default=None)
+        self.conn.execute("""
+            INSERT INTO files (inode, path, size, min_ts, max_ts) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (inode) DO UPDATE SET
+                path = excluded.path,
+                size = excluded.size,
+                min_ts = coalesce(min(min_ts, excluded.min_ts), min_ts, excluded.min_ts),
+                max_ts = coalesce(max(max_ts, excluded.max_ts), max_ts, excluded.max_ts)
+        """, (inode, path, position, min_ts, max_ts))
+
+    def _where(self, start_time, end_time, level, alert_type):
+        clauses, params = [], []
+        start_ts, end_ts = to_epoch(start_time), to_epoch(end_time)
+        if start_ts is not None:
+            clauses.append("p.bucket >= ? AND p.max_ts >= ?")
+            params += [int(start_ts // self.bucket_seconds), start_ts]
+        if end_ts is not None:
+            clauses.append("p.bucket <= ? AND p.min_ts <= ?")
+            params += [int(end_ts // self.bucket_seconds), end_ts]
+        if level:
+            clauses.append("p.level = ?")
+            params.append(level)
+        if alert_type:
+            clauses.append("p.alert_type = ?")
+            params.append(alert_type)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def ranges(self,
+               start_time: Optional[datetime] = None,
+               end_time: Optional[datetime] = None,
+               level: Optional[str] = None,
+               alert_type: Optional[str] = None) -> Dict[str, List[Tuple[int, int]]]:
+        where, params = self._where(start_time, end_time, level, alert_type)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT f.path, p.start_offset, p.end_offset FROM postings p JOIN files f ON f.inode = p.inode{where}",
+                params
+            ).fetchall()
+
+        by_path = {}
+        for path, start, end in rows:
+            by_path.setdefault(path, []).append((start, end))
+        return {path: merge_ranges(ranges) for path, ranges in by_path.items()}
+
+    def postings(self,
+                 start_time: Optional[datetime] = None,
+                 end_time: Optional[datetime] = None,
+                 level: Optional[str] = None,
+                 alert_type: Optional[str] = None) -> List[Tuple]:
+        where, params = self._where(start_time, end_time, level, alert_type)
+        with self.lock:
+            return self.conn.execute(
+                "SELECT f.path, p.bucket, p.level, p.alert_type, p.start_offset, p.end_offset, p.count, p.min_ts, p.max_ts "
+                f"FROM postings p JOIN files f ON f.inode = p.inode{where}",
+                params
+            ).fetchall()
@@ -0,0 +1,128 @@
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from config import (
+    TEMPLATE_SIMILARITY, TEMPLATE_MAX_CLUSTERS, TEMPLATE_MAX_CHILDREN, TEMPLATE_MAX_TOKENS, TEMPLATE_SAMPLE_VALUES
+)
+
+WILDCARD = '<*>'
+VARIABLE_TOKEN = re.compile(r'\d|^0x[0-9a-fA-F]+$|^[0-9a-fA-F]{12,}$')
+PRIORITY_NAMES = ['EMERG', 'ALERT', 'CRIT', 'ERR', 'WARNING', 'NOTICE', 'INFO', 'DEBUG']
+PRIORITY_WEIGHTS = [10, 10, 10, 10, 5, 2, 1, 1]
+
+
+@dataclass(eq=False)
+class LogCluster:
+    unit: str
+    tokens: List[str]
+    priority: int
+    count: int = 0
+    last_seen: float = 0.0
+    samples: Dict[int, List[str]] = field(default_factory=dict)
+
+    @property
+    def template(self) -> str:
+        return ' '.join(self.tokens)
+
+    @property
+    def weight(self) -> float:
+        return PRIORITY_WEIGHTS[self.priority] * (1 + math.log(self.count))
+
+    def sample_values(self, limit: int) -> List[str]:
+        values = []
+        for position in sorted(self.samples):
+            values.extend(self.samples[position])
+        return values[:limit]
+
+    def format(self, sample_limit: int = TEMPLATE_SAMPLE_VALUES) -> str:
+        timestamp = datetime.fromtimestamp(self.last_seen).strftime('%H:%M:%S') if self.last_seen else '--:--:--'
+        samples = self.sample_values(sample_limit)
+        example = f" [e.g. {', '.join(samples)}]" if samples else ""
+        return f"{timestamp} {self.unit}[{PRIORITY_NAMES[self.priority]}] x{self.count}: {self.template}{example}"
+
+
+class TemplateMiner:
+    def __init__(self, similarity=TEMPLATE_SIMILARITY, max_clusters=TEMPLATE_MAX_CLUSTERS,
+                 max_children=TEMPLATE_MAX_CHILDREN, max_tokens=TEMPLATE_MAX_TOKENS,
+                 sample_values=TEMPLATE_SAMPLE_VALUES):
+        self.similarity = similarity
+        self.max_clusters = max_clusters
+        self.max_children = max_children
+        self.max_tokens = max_tokens
+        self.sample_limit = sample_values
+        self.tree: Dict[tuple, Dict[str, List[LogCluster]]] = {}
+        self.clusters: OrderedDict = OrderedDict()
+        self.lines = 0
+
+    def tokenize(self, message: str) -> List[str]:
+        tokens = message.split()
+        if len(tokens) > self.max_tokens:
+            tokens = tokens[:self.max_tokens - 1] + [WILDCARD]
+        return tokens
+
+    def _branch(self, unit: str, tokens: List[str]) -> List[LogCluster]:
+        children = self.tree.setdefault((unit, len(tokens)), {})
+        first = tokens[0] if tokens and not VARIABLE_TOKEN.search(tokens[0]) else WILDCARD
+        if first not in children and len(children) >= self.max_children:
+            first = WILDCARD
+        return children.setdefault(first, [])
+
+    def _match(self, branch: List[LogCluster], tokens: List[str]) -> Optional[LogCluster]:
+        best, best_score = None, -1.0
+        for cluster in branch:
+            same = 0
+            for template_token, token in zip(cluster.tokens, tokens):
+                if template_token == token or template_token == WILDCARD:
+                    same += 1
+            score = same / len(tokens) if tokens else 1.0
+            if score > best_score:
+                best, best_score = cluster, score
+        return best if best_score >= self.similarity else None
+
+    def _evict(self):
+        while len(self.clusters) > self.max_clusters:
+            victim = next((key for key, cluster in self.clusters.items() if cluster.priority > 4), None)
+            cluster = self.clusters.pop(next(iter(self.clusters)) if victim is None else victim)
+            tokens = cluster.tokens
+            children = self.tree.get((cluster.unit, len(tokens)), {})
+            for branch in children.values():
+                if cluster in branch:
+                    branch.remove(cluster)
+                    break
+
+    def add(self, message: str, unit: str = '', priority: int = 6, timestamp: float = 0.0) -> LogCluster:
+        self.lines += 1
+        tokens = self.tokenize(message)
+        branch = self._branch(unit, tokens)
+        cluster = self._match(branch, tokens)
+
+        if cluster is None:
+            cluster = LogCluster(unit, [WILDCARD if VARIABLE_TOKEN.search(token) else token for token in tokens], priority)
+            branch.append(cluster)
+            self.clusters[id(cluster)] = cluster
+            self._evict()
+        else:
+            self.clusters.move_to_end(id(cluster))
+
+        for position, (template_token, token) in enumerate(zip(cluster.tokens, tokens)):
+            if template_token != WILDCARD and template_token != token:
+                cluster.tokens[position] = WILDCARD
+            if cluster.tokens[position] == WILDCARD:
+                samples = cluster.samples.setdefault(position, [])
+                if len(samples) < self.sample_limit and token != WILDCARD and token not in samples:
+                    samples.append(token)
+
+        cluster.count += 1
+        cluster.priority = min(cluster.priority, priority)
+        cluster.last_seen = max(cluster.last_seen, timestamp)
+        return cluster
+
+    def top(self, limit: int) -> List[LogCluster]:
+        return sorted(self.clusters.values(), key=lambda cluster: cluster.weight, reverse=True)[:limit]
+
+    def summary(self, limit: int) -> List[str]:
+        return [cluster.format(self.sample_limit) for cluster in self.top(limit)]
+
@@ -1,12 +1,59 @@
+import os
+import math
+import time
 import streamlit as st
 import pandas as pd
 from log_aggregator import LogAggregator
+from metric_history import MetricHistory
+from metrics_collector import METRICS
+from config import METRIC_HISTORY_DIR
 from datetime import datetime, timedelta
-import json
 
 st.set_page_config(page_title="DevOps Agent Logs", layout="wide")
 
-aggregator = LogAggregator()
+@st.cache_resource
+def get_aggregator():
+    return LogAggregator()
+
+@st.cache_resource
+def get_metric_history():
+    return MetricHistory(directory=METRIC_HISTORY_DIR, readonly=True)
+
+def log_signature():
+    signature = []
+    for log_file in get_aggregator().get_log_files():
+        try:
+            stat = os.stat(log_file)
+        except OSError:
+            continue
+        signature.append((log_file, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_summary(signature, hours, level, alert_type, search_text):
+    return get_aggregator().aggregate(
+        start_time=datetime.utcnow() - timedelta(hours=hours),
+        level=level,
+        alert_type=alert_type,
+        search_text=search_text
+    )
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_page(signature, hours, level, alert_type, search_text, page, page_size):
+    return get_aggregator().search_logs(
+        start_time=datetime.utcnow() - timedelta(hours=hours),
+        level=level,
+        alert_type=alert_type,
+        search_text=search_text,
+        offset=page * page_size,
+        limit=page_size
+    )
+
+def format_timestamp(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
+    except:
+        return value
 
 st.title("DevOps Agent Log Viewer")
 
@@ -22,88 +69,90 @@ with col3:
     alert_type = st.selectbox("Alert Type", ["All", "incident", "metrics", "remediation"])
 
 with col4:
-    limit = st.selectbox("Max Results", [50, 100, 500], index=1)
+    page_size = st.selectbox("Page Size", [50, 100, 500], index=1)
 
 search_text = st.text_input("Search logs", placeholder="Enter search text...")
 
 if st.button("Refresh"):
     st.rerun()
 
-start_time = datetime.utcnow() - timedelta(hours=hours)
-
-logs = aggregator.search_logs(
-    start_time=start_time,
-    level=None if level == "All" else level,
-    alert_type=None if alert_type == "All" else alert_type,
-    search_text=search_text if search_text else None,
-    limit=limit
+filters = (
+    None if level == "All" else level,
+    None if alert_type == "All" else alert_type,
+    search_text if search_text else None
 )
+signature = log_signature()
+summary = load_summary(signature, hours, *filters)
 
-if logs:
-    df = pd.DataFrame(logs)
-    
+if summary['total']:
     col1, col2, col3, col4 = st.columns(4)
-    
+
     with col1:
-        st.metric("Total Logs", len(logs))
-    
+        st.metric("Total Logs", summary['total'])
+
     with col2:
-        incidents = len([l for l in logs if l.get('alert_type') == 'incident'])
-        st.metric("Incidents", incidents)
-    
+        st.metric("Incidents", summary['by_alert_type'].get('incident', 0))
+
     with col3:
-        errors = len([l for l in logs if l.get('level') == 'ERROR'])
-        st.metric("Errors", errors)
-    
+        st.metric("Errors", summary['by_level'].get('ERROR', 0))
+
     with col4:
-        warnings = len([l for l in logs if l.get('level') == 'WARNING'])
-        st.metric("Warnings", warnings)
-    
+        st.metric("Warnings", summary['by_level'].get('WARNING', 0))
+
+    if summary['histogram']:
+        st.subheader("Timeline")
+        timeline = pd.DataFrame(
+            [{'time': bucket['time'], **bucket['by_level']} for bucket in summary['histogram']]
+        ).set_index('time').fillna(0)
+        st.bar_chart(timeline)
+
+    history = get_metric_history()
+    if history.buffers:
+        st.subheader("Metric History")
+        start = time.time() - hours * 3600
+        step = max(60, hours * 60)
+        series = {}
+        for name in history.buffers:
+            timestamps, values = history.rollup(name, step, 'max', start=start)
+            series[METRICS[name].label] = pd.Series(values, index=pd.to_datetime(timestamps, unit='s'))
+        st.line_chart(pd.DataFrame(series))
+
     st.subheader("Log Entries")
-    
-    for log in logs:
-        timestamp = datetime.fromisoformat(log['timestamp'].replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
-        
-        if log['level'] == 'ERROR':
-            st.error(f"**{timestamp}** | {log['message']}")
-        elif log['level'] == 'WARNING':
-            st.warning(f"**{timestamp}** | {log['message']}")
-        else:
-            st.info(f"**{timestamp}** | {log['message']}")
-        
-        with st.expander("Details"):
-            details = {
-                "Level": log.get('level'),
-                "Module": log.get('module'),
-                "Function": log.get('function'),
-                "Line": log.get('line')
-            }
-            
-            if log.get('alert_type'):
-                details["Alert Type"] = log.get('alert_type')
-            if log.get('confidence'):
-                details["Confidence"] = log.get('confidence')
-            if log.get('duration'):
-                details["Duration"] = f"{log.get('duration')}s"
-            if log.get('metrics'):
-                details["Metrics"] = json.dumps(log.get('metrics'), indent=2)
-            
-            for key, value in details.items():
-                if value:
-                    st.text(f"{key}: {value}")
+
+    total_pages = max(1, math.ceil(summary['total'] / page_size))
+    page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1, step=1)
+    logs = load_page(signature, hours, *filters, page - 1, page_size)
+
+    table = pd.DataFrame([
+        {
+            "Time": format_timestamp(log.get('timestamp', '')),
+            "Level": log.get('level'),
+            "Alert Type": log.get('alert_type'),
+            "Message": log.get('message'),
+            "Module": log.get('module'),
+            "Confidence": log.get('confidence'),
+            "Duration": log.get('duration')
+        }
+        for log in logs
+    ])
+    st.dataframe(table, use_container_width=True, hide_index=True, height=min(35 * (len(logs) + 1) + 3, 600))
+
+    if logs:
+        with st.expander("Entry details"):
+            selected = st.selectbox(
+                "Entry",
+                range(len(logs)),
+                format_func=lambda i: f"{table.iloc[i]['Time']} | {table.iloc[i]['Level']} | {str(table.iloc[i]['Message'])[:80]}"
+            )
+            st.json(logs[selected])
 
 else:
     st.info("No logs found matching the criteria.")
 
 st.sidebar.markdown("### Quick Stats")
-recent_logs = aggregator.search_logs(start_time=datetime.utcnow() - timedelta(hours=1), limit=1000)
-
-if recent_logs:
-    level_counts = {}
-    for log in recent_logs:
-        level = log.get('level', 'UNKNOWN')
-        level_counts[level] = level_counts.get(level, 0) + 1
-    
-    st.sidebar.json(level_counts)
+recent_summary = load_summary(signature, 1, None, None, None)
+
+if recent_summary['total']:
+    st.sidebar.json(recent_summary['by_level'])
 else:
-    st.sidebar.text("No recent activity")
\ No newline at end of file
+    st.sidebar.text("No recent activity")
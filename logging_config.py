@@ -1,14 +1,32 @@
 import os
+import atexit
+import queue
 import logging
 import logging.handlers
 import json
+import threading
+import time
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "devops-agent.log")
 MAX_BYTES = 10 * 1024 * 1024
 BACKUP_COUNT = 5
 
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "true").lower() == "true"
+LOG_QUEUE_SIZE = 10000
+# drop-oldest / drop-debug never wait on a full queue; "block" is the only policy that can stall a check cycle
+LOG_QUEUE_OVERFLOW = os.getenv("LOG_QUEUE_OVERFLOW", "drop-oldest")
+LOG_BATCH_SIZE = 256
+
+LOG_FAST_FORMATTER = os.getenv("LOG_FAST_FORMATTER", "true").lower() == "true"
+LOG_EXTRA_FIELDS = ('metrics', 'alert_type', 'duration', 'confidence')
+
 os.makedirs(LOG_DIR, exist_ok=True)
 
 class JSONFormatter(logging.Formatter):
@@ -34,20 +52,160 @@ class JSONFormatter(logging.Formatter):
             
         return json.dumps(log_entry)
 
+class FastJSONFormatter(JSONFormatter):
+    def __init__(self, extra_fields=LOG_EXTRA_FIELDS, use_orjson=True):
+        super().__init__()
+        self.extra_fields = tuple(extra_fields)
+        self.use_orjson = use_orjson and orjson is not None
+        self.encoder = json.JSONEncoder(default=str)
+        self.cached_second = None
+        self.cached_prefix = ''
+
+    def timestamp(self, created):
+        second = int(created)
+        if second != self.cached_second:
+            self.cached_second = second
+            self.cached_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        return f"{self.cached_prefix}.{int((created - second) * 1000000):06d}"
+
+    def dumps(self, log_entry):
+        if self.use_orjson:
+            try:
+                return orjson.dumps(log_entry, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+            except TypeError:
+                pass
+        return self.encoder.encode(log_entry)
+
+    def format(self, record):
+        log_entry = {
+            'timestamp': self.timestamp(record.created),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno
+        }
+
+        attributes = record.__dict__
+        for field in self.extra_fields:
+            if field in attributes:
+                log_entry[field] = attributes[field]
+
+        return self.dumps(log_entry)
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue, overflow=LOG_QUEUE_OVERFLOW):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def enqueue(self, record):
+        if self.overflow == 'block':
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow == 'drop-debug' and record.levelno < logging.WARNING:
+                self.dropped += 1
+                return
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+                self.queue.task_done()
+
+            for handler in self.handlers:
+                if isinstance(handler, BatchedRotatingFileHandler):
+                    handler.flush_batch()
+
+            if stop:
+                break
+
+_queue_handler = None
+_listener = None
+_lock = threading.Lock()
+
+def create_file_handler(handler_class=logging.handlers.RotatingFileHandler):
+    handler = handler_class(LOG_FILE, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT)
+    handler.setFormatter(FastJSONFormatter() if LOG_FAST_FORMATTER else JSONFormatter())
+    return handler
+
+def create_console_handler():
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO)
+    console.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    return console
+
+def get_queue_handler():
+    global _queue_handler, _listener
+    with _lock:
+        if _queue_handler is None:
+            log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+            _queue_handler = BoundedQueueHandler(log_queue)
+            _listener = BatchingQueueListener(
+                log_queue,
+                create_file_handler(BatchedRotatingFileHandler),
+                create_console_handler(),
+                respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(shutdown_logging)
+        return _queue_handler
+
+def shutdown_logging():
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+            _queue_handler.overflow = 'drop-oldest'
+
 def setup_logger(name):
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    
+
     if not logger.handlers:
-        handler = logging.handlers.RotatingFileHandler(
-            LOG_FILE, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT
-        )
-        handler.setFormatter(JSONFormatter())
-        logger.addHandler(handler)
-        
-        console = logging.StreamHandler()
-        console.setLevel(logging.INFO)
-        console.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-        logger.addHandler(console)
-    
-    return logger
\ No newline at end of file
+        if LOG_QUEUE_ENABLED:
+            logger.addHandler(get_queue_handler())
+        else:
+            logger.addHandler(create_file_handler())
+            logger.addHandler(create_console_handler())
+
+    return logger
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+import numpy as np
+from typing import Dict, Optional, Tuple
+from config import METRIC_HISTORY_CAPACITY, METRIC_HISTORY_DIR, METRIC_HISTORY_PERSIST
+from metrics_collector import METRICS
+
+AGGREGATIONS = {
+    'mean': np.mean,
+    'min': np.min,
+    'max': np.max,
+    'p50': lambda values: np.percentile(values, 50),
+    'p95': lambda values: np.percentile(values, 95),
+}
+
+
+class RingBuffer:
+    def __init__(self, capacity=METRIC_HISTORY_CAPACITY, path=None, readonly=False):
+        self.capacity = capacity
+        self.path = path
+        self.lock = threading.Lock()
+        if path:
+            self.data = self._open_mmap(path, readonly)
+        else:
+            self.data = np.zeros((capacity + 1, 2))
+
+    def _open_mmap(self, path, readonly):
+        shape = (self.capacity + 1, 2)
+        expected_size = shape[0] * shape[1] * 8
+        if readonly:
+            size = os.path.getsize(path)
+            self.capacity = size // 16 - 1
+            return np.memmap(path, dtype=np.float64, mode='r', shape=(self.capacity + 1, 2))
+        if not os.path.exists(path) or os.path.getsize(path) != expected_size:
+            return np.memmap(path, dtype=np.float64, mode='w+', shape=shape)
+        return np.memmap(path, dtype=np.float64, mode='r+', shape=shape)
+
+    @property
+    def head(self) -> int:
+        return int(self.data[0, 0])
+
+    @property
+    def count(self) -> int:
+        return int(self.data[0, 1])
+
+    def append(self, timestamp: float, value: float):
+        with self.lock:
+            head = self.head
+            self.data[head + 1] = (timestamp, value)
+            self.data[0] = ((head + 1) % self.capacity, min(self.count + 1, self.capacity))
+
+    def snapshot(self) -> np.ndarray:
+        with self.lock:
+            head, count = self.head, self.count
+            rows = self.data[1:]
+            if count < self.capacity:
+                return np.array(rows[:count])
+            return np.concatenate((rows[head:], rows[:head]))
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        samples = self.snapshot()
+        timestamps, values = samples[:, 0], samples[:, 1]
+        low = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        high = len(timestamps) if end is None else np.searchsorted(timestamps, end, side='right')
+        return timestamps[low:high], values[low:high]
+
+    def rollup(self, step: float, aggregation='mean', start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        timestamps, values = self.range(start, end)
+        if not len(timestamps):
+            return timestamps, values
+        buckets = np.floor(timestamps / step) * step
+        edges = np.flatnonzero(np.diff(buckets)) + 1
+        aggregate = AGGREGATIONS[aggregation]
+        groups = np.split(values, edges)
+        return buckets[np.concatenate(([0], edges))], np.array([aggregate(group) for group in groups])
+
+    def percentile(self, q, start=None, end=None) -> Optional[float]:
+        _, values = self.range(start, end)
+        if not len(values):
+            return None
+        return float(np.percentile(values, q))
+
+    def flush(self):
+        if isinstance(self.data, np.memmap) and self.data.mode != 'r':
+            self.data.flush()
+
+
+class MetricHistory:
+    def __init__(self, capacity=METRIC_HISTORY_CAPACITY, directory=None, readonly=False):
+        self.directory = directory
+        if directory and not readonly:
+            os.makedirs(directory, exist_ok=True)
+        self.buffers = {}
+        for name in METRICS:
+            path = os.path.join(directory, f"{name}.ring") if directory else None
+            if readonly and (not path or not os.path.exists(path)):
+                continue
+            self.buffers[name] = RingBuffer(capacity, path, readonly)
+
+    def record(self, snapshot):
+        for name, reading in snapshot.readings.items():
+            if not reading.error and name in self.buffers:
+                self.buffers[name].append(snapshot.collected_at, reading.value)
+
+    def range(self, name, start=None, end=None):
+        return self.buffers[name].range(start, end)
+
+    def rollup(self, name, step, aggregation='mean', start=None, end=None):
+        return self.buffers[name].rollup(step, aggregation, start, end)
+
+    def percentile(self, name, q, start=None, end=None):
+        return self.buffers[name].percentile(q, start, end)
+
+    def summary(self, window: float, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        start = (time.time() if now is None else now) - window
+        summary = {}
+        for name, buffer in self.buffers.items():
+            _, values = buffer.range(start)
+            if len(values):
+                summary[name] = {
+                    'samples': int(len(values)),
+                    'min': float(values.min()),
+                    'p50': float(np.percentile(values, 50)),
+                    'p95': float(np.percentile(values, 95)),
+                    'max': float(values.max()),
+                    'last': float(values[-1])
+                }
+        return summary
+
+    def flush(self):
+        for buffer in self.buffers.values():
+            buffer.flush()
+
+
+def open_history(readonly=False) -> MetricHistory:
+    if METRIC_HISTORY_PERSIST:
+        return MetricHistory(directory=METRIC_HISTORY_DIR, readonly=readonly)
+    return MetricHistory()
@@ -0,0 +1,206 @@
+import time
+import psutil
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+from requests.adapters import HTTPAdapter
+from agent_metrics import observe_queries
+from tracing import span, traced
+from config import PROMETHEUS_URL, PROMETHEUS_QUERY_TIMEOUT_SECONDS, CPU_THRESHOLD, MEMORY_THRESHOLD, DISK_THRESHOLD, NETWORK_THRESHOLD, FLEET_DISK_MOUNTPOINT, FLEET_NETWORK_DEVICE_EXCLUDE, REMEDIATION_RECOVERY_RATE_WINDOW
+
+@dataclass(frozen=True)
+class MetricDefinition:
+    name: str
+    label: str
+    unit: str
+    threshold: float
+    query: str
+    fleet_query: str
+    optional: bool = False
+
+    @property
+    def error_label(self) -> str:
+        return self.label if self.label.isupper() else self.label.lower()
+
+
+METRIC_DEFINITIONS = [
+    MetricDefinition(
+        'cpu', 'CPU', '%', CPU_THRESHOLD,
+        '100-(avg(rate(node_cpu_seconds_total{mode="idle"}[5m]))*100)',
+        '100-(avg by (instance)(rate(node_cpu_seconds_total{mode="idle"}[5m]))*100)'
+    ),
+    MetricDefinition(
+        'memory', 'Memory', '%', MEMORY_THRESHOLD,
+        '100*(1-node_memory_MemAvailable_bytes/node_memory_MemTotal_bytes)',
+        'max by (instance)(100*(1-node_memory_MemAvailable_bytes/node_memory_MemTotal_bytes))'
+    ),
+    MetricDefinition(
+        'disk', 'Disk', '%', DISK_THRESHOLD,
+        '100*(1-node_filesystem_avail_bytes{mountpoint="/"}/node_filesystem_size_bytes{mountpoint="/"})',
+        f'max by (instance)(100*(1-node_filesystem_avail_bytes{{mountpoint="{FLEET_DISK_MOUNTPOINT}"}}/node_filesystem_size_bytes{{mountpoint="{FLEET_DISK_MOUNTPOINT}"}}))'
+    ),
+    MetricDefinition(
+        'network', 'Network', ' Mbps', NETWORK_THRESHOLD,
+        'rate(node_network_transmit_bytes_total{device="ens5"}[5m])*8/1000000',
+        f'sum by (instance)(rate(node_network_transmit_bytes_total{{device!~"{FLEET_NETWORK_DEVICE_EXCLUDE}"}}[5m]))*8/1000000',
+        optional=True
+    ),
+]
+
+METRICS = {definition.name: definition for definition in METRIC_DEFINITIONS}
+QUERIES = {definition.name: definition.query for definition in METRIC_DEFINITIONS}
+RECOVERY_QUERIES = {name: query.replace('[5m]', f'[{REMEDIATION_RECOVERY_RATE_WINDOW}]') for name, query in QUERIES.items()}
+THRESHOLDS = {definition.name: definition.threshold for definition in METRIC_DEFINITIONS}
+
+
+@dataclass
+class MetricReading:
+    name: str
+    value: float = 0.0
+    error: Optional[str] = None
+    latency: float = 0.0
+
+
+@dataclass
+class MetricsSnapshot:
+    readings: Dict[str, MetricReading]
+    source: str = 'prometheus'
+    collected_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+
+    def value(self, name: str) -> float:
+        reading = self.readings.get(name)
+        return reading.value if reading else 0.0
+
+    def result(self, name: str) -> str:
+        definition = METRICS[name]
+        reading = self.readings.get(name)
+        if reading is None or reading.error:
+            error = reading.error if reading else "not collected"
+            return f"Error monitoring {definition.error_label}: {error}"
+        if self.source == 'psutil' and name == 'network':
+            return f"Network normal: {reading.value:.2f} MB sent"
+        if reading.value > definition.threshold:
+            return f"{definition.label} spike detected: {reading.value:.2f}{definition.unit}"
+        return f"{definition.label} normal: {reading.value:.2f}{definition.unit}"
+
+    def format_value(self, name: str) -> str:
+        if self.source == 'psutil' and name == 'network':
+            return f"{self.value(name):.2f} MB"
+        return f"{self.value(name):.2f}{METRICS[name].unit}"
+
+    def formatted(self) -> Dict[str, str]:
+        return {name: self.format_value(name) for name in METRICS}
+
+    def observed(self) -> Dict[str, float]:
+        return {name: reading.value for name, reading in self.readings.items() if not reading.error}
+
+    def failed(self) -> bool:
+        return all(reading.error for reading in self.readings.values())
+
+    def merged(self, update: 'MetricsSnapshot') -> 'MetricsSnapshot':
+        if update.source != self.source:
+            return update
+        return MetricsSnapshot({**self.readings, **update.readings}, update.source, update.collected_at, update.duration)
+
+    @property
+    def cpu_value(self) -> float:
+        return self.value('cpu')
+
+    @property
+    def memory_value(self) -> float:
+        return self.value('memory')
+
+    @property
+    def disk_value(self) -> float:
+        return self.value('disk')
+
+    @property
+    def network_value(self) -> float:
+        return self.value('network')
+
+    @property
+    def cpu_result(self) -> str:
+        return self.result('cpu')
+
+    @property
+    def memory_result(self) -> str:
+        return self.result('memory')
+
+    @property
+    def disk_result(self) -> str:
+        return self.result('disk')
+
+    @property
+    def network_result(self) -> str:
+        return self.result('network')
+
+
+class PrometheusCollector:
+    def __init__(self, base_url=PROMETHEUS_URL, timeout=PROMETHEUS_QUERY_TIMEOUT_SECONDS, queries=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.queries = dict(queries or QUERIES)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(self.queries))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=len(self.queries), thread_name_prefix='prometheus')
+
+    def query(self, name: str, deadline: float) -> MetricReading:
+        started = time.monotonic()
+        remaining = deadline - started
+        if remaining <= 0:
+            return MetricReading(name, error="deadline exceeded before query was sent")
+        try:
+            response = self.session.get(
+                f"{self.base_url}/api/v1/query",
+                params={'query': self.queries[name]},
+                timeout=remaining
+            )
+            data = response.json()
+            result = data['data']['result']
+            if not result and METRICS[name].optional:
+                value = 0.0
+            else:
+                value = float(result[0]['value'][1])
+            return MetricReading(name, value, latency=time.monotonic() - started)
+        except Exception as e:
+            return MetricReading(name, error=str(e), latency=time.monotonic() - started)
+
+    def collect(self, names: Optional[Iterable[str]] = None) -> MetricsSnapshot:
+        with span('prometheus.collect'):
+            names = list(names or self.queries)
+            started = time.monotonic()
+            deadline = started + self.timeout
+            futures = {self.executor.submit(self.query, name, deadline): name for name in names}
+            done, _ = wait(futures, timeout=self.timeout)
+
+            readings = {}
+            for future, name in futures.items():
+                if future in done:
+                    readings[name] = future.result()
+                else:
+                    future.cancel()
+                    readings[name] = MetricReading(name, error=f"query timed out after {self.timeout}s", latency=self.timeout)
+
+            observe_queries(readings.values())
+            return MetricsSnapshot(readings, duration=time.monotonic() - started)
+
+
+@traced('psutil.collect')
+def collect_psutil_snapshot() -> MetricsSnapshot:
+    started = time.monotonic()
+    cpu_usage = psutil.cpu_percent(interval=1)
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    network = psutil.net_io_counters()
+
+    readings = {
+        'cpu': MetricReading('cpu', cpu_usage),
+        'memory': MetricReading('memory', memory.percent),
+        'disk': MetricReading('disk', disk.percent),
+        'network': MetricReading('network', network.bytes_sent/1024/1024),
+    }
+    return MetricsSnapshot(readings, source='psutil', duration=time.monotonic() - started)
@@ -1,43 +1,205 @@
 import time
+from contextlib import nullcontext
 from datetime import datetime
 from main import main as run_crew
-from config import MONITORING_INTERVAL_SECONDS
-from logging_config import setup_logger
+from config import MONITORING_INTERVAL_SECONDS, FAST_PATH_ENABLED, FAST_PATH_INTERVAL_SECONDS, ESCALATION_COOLDOWN_SECONDS, FLEET_MODE_ENABLED, METRICS_EXPORTER_ENABLED
+from agent_metrics import start_exporter
+from fleet import FleetMonitor
+from journal import journal_collector
+from scheduler import CycleScheduler, StageTimer
+from tracing import cycle
+from metrics_collector import METRICS
+from notifications import send_incident_alert, resolve_alerts
+from logging_config import setup_logger, shutdown_logging
+from tools import get_prometheus_metrics, evaluate_snapshot, use_detection
 
 logger = setup_logger('monitor')
 
-def continuous_monitor():
-   print(f"Starting continuous DevOps monitoring (every {MONITORING_INTERVAL_SECONDS} seconds)...")
+LLM_CALLS_PER_CREW_RUN = 2
+
+class CycleStats:
+   def __init__(self):
+       self.cycles = 0
+       self.crew_runs = 0
+       self.llm_calls_avoided = 0
+       self.last_latency = 0.0
+       self.max_latency = 0.0
+       self.total_latency = 0.0
+
+   def record(self, latency, escalated):
+       self.cycles += 1
+       if escalated:
+           self.crew_runs += 1
+       else:
+           self.llm_calls_avoided += LLM_CALLS_PER_CREW_RUN
+       self.last_latency = latency
+       self.max_latency = max(self.max_latency, latency)
+       self.total_latency += latency
+
+   def as_dict(self):
+       return {
+           'cycles': self.cycles,
+           'crew_runs': self.crew_runs,
+           'llm_calls_avoided': self.llm_calls_avoided,
+           'last_latency_ms': round(self.last_latency * 1000, 2),
+           'avg_latency_ms': round(self.total_latency / self.cycles * 1000, 2) if self.cycles else 0.0,
+           'max_latency_ms': round(self.max_latency * 1000, 2)
+       }
+
+class Escalation:
+   def __init__(self, snapshot, detection, escalated):
+       self.snapshot = snapshot
+       self.detection = detection
+       self.escalated = escalated
+
+   @property
+   def reason(self):
+       return f"escalated: {', '.join(self.escalated)}"
+
+class EscalationGate:
+   def __init__(self, cooldown=ESCALATION_COOLDOWN_SECONDS):
+       self.cooldown = cooldown
+       self.escalated = {}
+       self.held = 0
+
+   def allow(self, issues, now=None):
+       now = time.monotonic() if now is None else now
+       for name in list(self.escalated):
+           if name not in issues:
+               del self.escalated[name]
+       due = [name for name in issues if name not in self.escalated or now - self.escalated[name] >= self.cooldown]
+       if not due:
+           if issues:
+               self.held += 1
+           return False
+       for name in issues:
+           self.escalated[name] = now
+       return True
+
+def fast_path_check(stats, timer, gate):
+   started = time.monotonic()
+   with timer.time('collect'):
+       snapshot = get_prometheus_metrics()
+   with timer.time('detect'):
+       detection, escalated = evaluate_snapshot(snapshot)
+
+   escalation = None
+   if gate.allow(list(escalated)):
+       escalation = Escalation(snapshot, detection, escalated)
+       logger.warning("Sustained threshold breach, escalating to agents", extra={
+           'alert_type': 'monitoring',
+           'metrics': {name: round(snapshot.value(name), 2) for name in snapshot.readings}
+       })
+       journal_collector.prefetch()
+
+   latency = time.monotonic() - started
+   stats.record(latency, escalation is not None)
+   logger.info("Fast-path check completed", extra={
+       'alert_type': 'monitoring',
+       'duration': round(latency, 3),
+       'metrics': {**stats.as_dict(), 'escalations_held': gate.held}
+   })
+   return escalation, list(escalated)
+
+def fleet_check(stats, fleet_monitor, timer):
+   started = time.monotonic()
+   with timer.time('collect'):
+       snapshot = fleet_monitor.collector.collect()
+   with timer.time('detect'):
+       evaluation = fleet_monitor.evaluate(snapshot)
+
+   with timer.time('alert'):
+       for instance, issues in evaluation.by_instance().items():
+           send_incident_alert(
+               snapshot.metrics_for(instance),
+               [METRICS[issue.metric].label for issue in issues],
+               host=instance
+           )
+       for instance, metric in evaluation.cleared:
+           resolve_alerts(metric, host=instance)
+
+   latency = time.monotonic() - started
+   stats.record(latency, bool(evaluation.sustained))
+   logger.info("Fleet check completed", extra={
+       'alert_type': 'monitoring',
+       'duration': round(latency, 3),
+       'metrics': {
+           'targets': evaluation.targets,
+           'sustained': len(evaluation.sustained),
+           'tracking': evaluation.tracking,
+           'query_errors': len(snapshot.errors),
+           'evaluation_ms': round(evaluation.duration * 1000, 2),
+           **stats.as_dict()
+       }
+   })
+   return evaluation
+
+def run_crew_check(work):
+   reason = work.reason if isinstance(work, Escalation) else work
+   timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+   print(f"\n[{timestamp}] Running system check ({reason})...")
+   logger.info("Starting system check", extra={'alert_type': 'monitoring'})
+   handoff = use_detection(work.snapshot, work.detection, work.escalated) if isinstance(work, Escalation) else nullcontext()
+   with cycle('analysis'), handoff:
+       result = run_crew()
+   print(result)
+   logger.info("System check completed", extra={'alert_type': 'monitoring'})
+   print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Check completed")
+   print("-" * 50)
+
+def continuous_monitor(max_ticks=None):
+   interval = FAST_PATH_INTERVAL_SECONDS if FAST_PATH_ENABLED or FLEET_MODE_ENABLED else MONITORING_INTERVAL_SECONDS
+   mode = "fleet" if FLEET_MODE_ENABLED else "fast-path" if FAST_PATH_ENABLED else "crew"
+   fleet_monitor = FleetMonitor() if FLEET_MODE_ENABLED else None
+   print(f"Starting continuous DevOps monitoring ({mode} mode, every {interval} seconds)...")
    print("Press Ctrl+C to stop")
-   
+
    logger.info("DevOps monitoring started", extra={'alert_type': 'system'})
-   
-   while True:
-       try:
-           timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-           print(f"\n[{timestamp}] Running system check...")
-
-           logger.info("Starting system check", extra={'alert_type': 'monitoring'})
-           result = run_crew()
-           print(result)
-           logger.info("System check completed", extra={'alert_type': 'monitoring'})
-           
-           print(f"[{timestamp}] Check completed")
-           print("-" * 50)
-           
-           time.sleep(MONITORING_INTERVAL_SECONDS)
-           
-       except KeyboardInterrupt:
-           print("\nMonitoring stopped by user")
-           logger.info("Monitoring stopped by user", extra={'alert_type': 'system'})
-           break
-       except Exception as e:
-           timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-           print(f"[{timestamp}] Monitor error: {e}")
-           print(f"Retrying in {MONITORING_INTERVAL_SECONDS} seconds...")
-           logger.error(f"Monitor error: {e}", extra={'alert_type': 'error'})
-           time.sleep(MONITORING_INTERVAL_SECONDS)
+   if METRICS_EXPORTER_ENABLED:
+       start_exporter()
+   stats = CycleStats()
+   timer = StageTimer()
+   gate = EscalationGate()
+
+   def tick():
+       with cycle(mode):
+           return mode_tick()
+
+   def mode_tick():
+       timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+       if FLEET_MODE_ENABLED:
+           evaluation = fleet_check(stats, fleet_monitor, timer)
+           print(f"[{timestamp}] Fleet check: {evaluation.targets} targets, {len(evaluation.sustained)} sustained issue(s), {evaluation.tracking} tracking ({stats.last_latency*1000:.0f}ms)")
+           return None
+       if FAST_PATH_ENABLED:
+           escalation, issues = fast_path_check(stats, timer, gate)
+           status = escalation.reason if escalation else f"ongoing: {', '.join(issues)}" if issues else "healthy"
+           print(f"[{timestamp}] Fast-path check {status} ({stats.last_latency*1000:.0f}ms, {stats.llm_calls_avoided} LLM calls avoided)")
+           return escalation
+       return "scheduled"
+
+   def on_error(error):
+       timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+       print(f"[{timestamp}] Monitor error: {error}")
+       logger.error(f"Monitor error: {error}", extra={'alert_type': 'error'})
+
+   def on_report(scheduler_stats):
+       logger.info("Scheduler stats", extra={'alert_type': 'monitoring', 'metrics': scheduler_stats})
+
+   scheduler = CycleScheduler(interval, tick, run_crew_check, timer=timer, on_error=on_error, on_report=on_report)
+   try:
+       scheduler.run(max_ticks)
+   except KeyboardInterrupt:
+       print("\nMonitoring stopped by user")
+       logger.info("Monitoring stopped by user", extra={
+           'alert_type': 'system',
+           'metrics': {**stats.as_dict(), 'scheduler': scheduler.stats()}
+       })
+   finally:
+       scheduler.stop(wait=max_ticks is not None)
+
+   shutdown_logging()
+   return {**stats.as_dict(), 'scheduler': scheduler.stats()}
 
 if __name__ == "__main__":
    continuous_monitor()
-
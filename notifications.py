@@ -1,17 +1,303 @@
 import requests
 import os
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+import socket
+import atexit
+from concurrent.futures import Future
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 import logging
+from agent_metrics import SLACK_DELIVERY_DURATION
+from tracing import traced
+from config import SLACK_QUEUE_SIZE, SLACK_RATE_PER_SECOND, SLACK_BURST, SLACK_MAX_RETRIES, SLACK_TIMEOUT_SECONDS, SLACK_SPILL_FILE, ALERT_SUPPRESSION_SECONDS, ALERT_DIGEST_INTERVAL_SECONDS
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-def send_slack_alert(title, message, color="danger", fields=None):
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 30.0
+
+class TokenBucket:
+    def __init__(self, rate=SLACK_RATE_PER_SECOND, capacity=SLACK_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class SlackDeliveryQueue:
+    def __init__(self, queue_size=SLACK_QUEUE_SIZE, rate=SLACK_RATE_PER_SECOND, burst=SLACK_BURST,
+                 max_retries=SLACK_MAX_RETRIES, timeout=SLACK_TIMEOUT_SECONDS, spill_file=SLACK_SPILL_FILE):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.spill_file = spill_file
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.buckets = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.spill_lock = threading.Lock()
+        self.worker = None
+        self.sent = 0
+        self.failed = 0
+        self.spilled = 0
+
+    def start(self):
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, name='slack-delivery', daemon=True)
+                self.worker.start()
+
+    def submit(self, webhook_url, payload):
+        self.start()
+        message_id = uuid.uuid4().hex
+        future = Future()
+        future.message_id = message_id
+        future.submitted = time.monotonic()
+        try:
+            self.queue.put_nowait((message_id, webhook_url, payload, future))
+        except queue.Full:
+            self._spill(message_id, webhook_url, payload, future)
+        return future
+
+    def close(self, timeout=10.0):
+        if self.worker is None:
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.worker.join(timeout)
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self._spill(*item)
+
+    def stats(self):
+        return {'sent': self.sent, 'failed': self.failed, 'spilled': self.spilled, 'queued': self.queue.qsize()}
+
+    def _bucket(self, webhook_url):
+        with self.lock:
+            if webhook_url not in self.buckets:
+                self.buckets[webhook_url] = TokenBucket(self.rate, self.burst)
+            return self.buckets[webhook_url]
+
+    def _spill(self, message_id, webhook_url, payload, future):
+        with self.lock:
+            self.pending[message_id] = future
+        with self.spill_lock:
+            try:
+                with open(self.spill_file, 'a') as f:
+                    f.write(json.dumps({'id': message_id, 'url': webhook_url, 'payload': payload}) + '\n')
+                self.spilled += 1
+                return
+            except OSError as e:
+                logger.error(f"Failed to spill Slack notification to disk: {e}")
+        with self.lock:
+            self.pending.pop(message_id, None)
+        self.failed += 1
+        future.set_result(False)
+
+    def _restore_spilled(self):
+        with self.spill_lock:
+            try:
+                with open(self.spill_file, 'r') as f:
+                    lines = f.readlines()
+            except OSError:
+                return
+            remaining = []
+            for line in lines:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                with self.lock:
+                    future = self.pending.pop(item['id'], None) or Future()
+                try:
+                    self.queue.put_nowait((item['id'], item['url'], item['payload'], future))
+                except queue.Full:
+                    with self.lock:
+                        self.pending[item['id']] = future
+                    remaining.append(line)
+            tmp_file = self.spill_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                f.writelines(remaining)
+            os.replace(tmp_file, self.spill_file)
+
+    def _run(self):
+        self._restore_spilled()
+        while True:
+            try:
+                item = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                if os.path.exists(self.spill_file) and os.path.getsize(self.spill_file):
+                    self._restore_spilled()
+                continue
+            if item is None:
+                break
+            self._deliver(*item)
+
+    def _deliver(self, message_id, webhook_url, payload, future):
+        submitted = getattr(future, 'submitted', time.monotonic())
+        bucket = self._bucket(webhook_url)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            retry_after = None
+            try:
+                response = self.session.post(webhook_url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning(f"Error sending Slack notification {message_id} (attempt {attempt + 1}): {e}")
+            else:
+                if response.status_code == 200:
+                    self.sent += 1
+                    logger.info("Slack notification sent successfully")
+                    SLACK_DELIVERY_DURATION.labels('sent').observe(time.monotonic() - submitted)
+                    future.set_result(True)
+                    return
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+                logger.warning(f"Slack notification {message_id} throttled or failed with {response.status_code} (attempt {attempt + 1})")
+                try:
+                    retry_after = float(response.headers.get('Retry-After', ''))
+                except ValueError:
+                    retry_after = None
+
+            if attempt < self.max_retries:
+                backoff = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt)
+                time.sleep(retry_after if retry_after is not None else random.uniform(0, backoff))
+
+        self.failed += 1
+        logger.error(f"Failed to send Slack notification {message_id}")
+        SLACK_DELIVERY_DURATION.labels('failed').observe(time.monotonic() - submitted)
+        future.set_result(False)
+
+def metric_number(value):
+    try:
+        return float(str(value).split()[0].rstrip('%'))
+    except (ValueError, IndexError):
+        return None
+
+class AlertDeduplicator:
+    def __init__(self, host=None, suppression_window=ALERT_SUPPRESSION_SECONDS, digest_interval=ALERT_DIGEST_INTERVAL_SECONDS):
+        self.host = host or socket.gethostname()
+        self.suppression_window = suppression_window
+        self.digest_interval = digest_interval
+        self.incidents = {}
+        self.lock = threading.Lock()
+        self.alerts_sent = 0
+        self.alerts_suppressed = 0
+        self.digests_sent = 0
+        self.resolved_sent = 0
+
+    def fingerprint(self, issues, host=None):
+        return f"{host or self.host}|{','.join(sorted(issues))}"
+
+    def _record_metrics(self, incident, metrics):
+        for name in ('cpu', 'memory', 'disk', 'network'):
+            value = metric_number(metrics.get(name))
+            if value is None:
+                continue
+            low, high, _ = incident['metrics'].get(name, (value, value, value))
+            incident['metrics'][name] = (min(low, value), max(high, value), value)
+
+    def observe(self, issues, metrics, now=None, host=None):
+        now = time.time() if now is None else now
+        key = self.fingerprint(issues, host)
+        with self.lock:
+            incident = self.incidents.get(key)
+            if incident is None or now - incident['last_seen'] > self.suppression_window:
+                incident = {
+                    'issues': sorted(issues),
+                    'host': host or self.host,
+                    'opened': now,
+                    'last_seen': now,
+                    'last_sent': now,
+                    'suppressed': 0,
+                    'metrics': {}
+                }
+                self.incidents[key] = incident
+                self._record_metrics(incident, metrics)
+                self.alerts_sent += 1
+                return 'alert', dict(incident)
+
+            self._record_metrics(incident, metrics)
+            incident['last_seen'] = now
+            if incident['suppressed'] and now - incident['last_sent'] >= self.digest_interval:
+                snapshot = dict(incident, metrics=dict(incident['metrics']))
+                incident['last_sent'] = now
+                incident['suppressed'] = 0
+                self.digests_sent += 1
+                return 'digest', snapshot
+
+            incident['suppressed'] += 1
+            self.alerts_suppressed += 1
+            return 'suppress', None
+
+    def resolve(self, metric_name, now=None, host=None):
+        now = time.time() if now is None else now
+        host = host or self.host
+        resolved = []
+        with self.lock:
+            for key, incident in list(self.incidents.items()):
+                if incident['host'] != host:
+                    continue
+                cleared = [issue for issue in incident['issues'] if issue.lower() == metric_name.lower()]
+                if not cleared:
+                    continue
+                del self.incidents[key]
+                remaining = [issue for issue in incident['issues'] if issue not in cleared]
+                if remaining:
+                    incident['issues'] = remaining
+                    self.incidents.setdefault(self.fingerprint(remaining, host), incident)
+                resolved.append(dict(incident, issues=cleared, remaining=remaining, resolved=now, metrics=dict(incident['metrics'])))
+            self.resolved_sent += len(resolved)
+        return resolved
+
+    def stats(self):
+        with self.lock:
+            return {
+                'alerts_sent': self.alerts_sent,
+                'alerts_suppressed': self.alerts_suppressed,
+                'digests_sent': self.digests_sent,
+                'resolved_sent': self.resolved_sent,
+                'open_incidents': len(self.incidents)
+            }
+
+delivery_queue = SlackDeliveryQueue()
+atexit.register(delivery_queue.close)
+alert_deduplicator = AlertDeduplicator()
+
+@traced('slack.submit')
+def submit_slack_alert(title, message, color="danger", fields=None):
     webhook_url = os.getenv("SLACK_WEBHOOK_URL")
     
     if not webhook_url:
         logger.warning("SLACK_WEBHOOK_URL not configured")
-        return False
+        return None
     
     payload = {
         "text": f"ALERT:: {title}",
@@ -29,19 +315,59 @@ def send_slack_alert(title, message, color="danger", fields=None):
         ]
     }
     
-    try:
-        response = requests.post(webhook_url, json=payload)
-        if response.status_code == 200:
-            logger.info("Slack notification sent successfully")
-            return True
-        else:
-            logger.error(f"Failed to send Slack notification: {response.status_code}")
-            return False
-    except Exception as e:
-        logger.error(f"Error sending Slack notification: {e}")
-        return False
-
-def send_incident_alert(metrics, issues, log_analysis=""):
+    return delivery_queue.submit(webhook_url, payload)
+
+def send_slack_alert(title, message, color="danger", fields=None):
+    future = submit_slack_alert(title, message, color, fields)
+    return future is not None and (not future.done() or future.result())
+
+def format_metric_ranges(incident):
+    return [
+        {"title": f"{name.capitalize()} (current / min / max)", "value": f"{current:.2f} / {low:.2f} / {high:.2f}", "short": True}
+        for name, (low, high, current) in incident['metrics'].items()
+    ]
+
+def send_digest_alert(incident):
+    fields = [
+        {"title": "Issues Ongoing", "value": ", ".join(incident['issues']), "short": False},
+        {"title": "Host", "value": incident['host'], "short": True},
+        {"title": "Ongoing For", "value": f"{int(incident['last_seen'] - incident['opened'])}s", "short": True},
+        {"title": "Suppressed Repeats", "value": str(incident['suppressed']), "short": True}
+    ] + format_metric_ranges(incident)
+    
+    return send_slack_alert(
+        "System Alert Digest - Issues Ongoing",
+        f"{len(incident['issues'])} issue(s) still active, {incident['suppressed']} repeat alert(s) suppressed",
+        "warning",
+        fields
+    )
+
+def send_resolved_alert(incident):
+    fields = [
+        {"title": "Issues Resolved", "value": ", ".join(incident['issues']), "short": False},
+        {"title": "Host", "value": incident['host'], "short": True},
+        {"title": "Duration", "value": f"{int(incident['resolved'] - incident['opened'])}s", "short": True}
+    ] + format_metric_ranges(incident)
+    if incident.get('remaining'):
+        fields.insert(1, {"title": "Still Active", "value": ", ".join(incident['remaining']), "short": False})
+    
+    return send_slack_alert(
+        "System Alert Resolved",
+        f"Issues cleared: {', '.join(incident['issues'])}",
+        "good",
+        fields
+    )
+
+def resolve_alerts(metric_name, host=None):
+    return [send_resolved_alert(incident) for incident in alert_deduplicator.resolve(metric_name, host=host)]
+
+def send_incident_alert(metrics, issues, log_analysis="", host=None):
+    decision, incident = alert_deduplicator.observe(issues, metrics, host=host)
+    if decision == 'suppress':
+        return None
+    if decision == 'digest':
+        return send_digest_alert(incident)
+    
     fields = [
         {"title": "CPU Usage", "value": f"{metrics.get('cpu', 'N/A')}", "short": True},
         {"title": "Memory Usage", "value": f"{metrics.get('memory', 'N/A')}", "short": True},
@@ -50,6 +376,9 @@ def send_incident_alert(metrics, issues, log_analysis=""):
         {"title": "Issues Detected", "value": ", ".join(issues), "short": False}
     ]
     
+    if host:
+        fields.append({"title": "Host", "value": host, "short": True})
+    
     if metrics.get('confidence'):
         fields.append({"title": "AI Confidence", "value": f"{metrics.get('confidence')} - {metrics.get('decision_reason', '')}", "short": True})
         fields.append({"title": "Auto-Remediate", "value": metrics.get('auto_remediate', 'Unknown'), "short": True})
@@ -83,6 +412,13 @@ def send_remediation_alert(status, pre_metrics, post_metrics):
     )
 
 def send_comprehensive_incident_alert(incident_metrics, issues, root_cause_analysis, remediation_status, pre_metrics, post_metrics, action_taken):
+    if remediation_status.startswith("SKIPPED"):
+        decision, incident = alert_deduplicator.observe(issues, incident_metrics)
+        if decision == 'suppress':
+            return None
+        if decision == 'digest':
+            return send_digest_alert(incident)
+    
     fields = [
         {"title": "Incident Details", "value": f"Issues: {', '.join(issues)}", "short": False},
         {"title": "CPU (Incident)", "value": f"{incident_metrics.get('cpu', 'N/A')}", "short": True},
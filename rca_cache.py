@@ -0,0 +1,67 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import RCA_CACHE_SIZE, RCA_CACHE_TTL_SECONDS, RCA_CACHE_METRIC_BUCKET
+
+FINGERPRINT_METRICS = ('cpu', 'memory', 'disk', 'network')
+LOG_NOISE = re.compile(r'0x[0-9a-fA-F]+|\b[0-9a-fA-F]{12,}\b|\d+')
+
+
+def bucket_metric(value, bucket_size=RCA_CACHE_METRIC_BUCKET) -> Optional[int]:
+    try:
+        number = float(str(value).split()[0].rstrip('%'))
+    except:
+        return None
+    return int(number // bucket_size * bucket_size)
+
+
+def normalize_logs(system_logs: str) -> str:
+    lines = {LOG_NOISE.sub('#', line).strip() for line in (system_logs or "").splitlines()}
+    lines.discard('')
+    return hashlib.sha1('\n'.join(sorted(lines)).encode()).hexdigest()
+
+
+def incident_fingerprint(metrics: Dict, issues: List[str], system_logs: str = "") -> str:
+    parts = [
+        ','.join(sorted(issues)),
+        ','.join(f"{name}={bucket_metric(metrics.get(name))}" for name in FINGERPRINT_METRICS),
+        normalize_logs(system_logs)
+    ]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+class RCACache:
+    def __init__(self, max_size=RCA_CACHE_SIZE, ttl=RCA_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple]:
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or now - entry[0] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Tuple):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries)}
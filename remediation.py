@@ -0,0 +1,329 @@
+import contextvars
+import os
+import shutil
+import subprocess
+import threading
+import time
+import psutil
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config import (
+    REMEDIATION_SERVICE, REMEDIATION_RESTART_TIMEOUT_SECONDS, REMEDIATION_RECOVERY_DEADLINE_SECONDS,
+    REMEDIATION_POLL_INITIAL_SECONDS, REMEDIATION_POLL_MAX_SECONDS, REMEDIATION_MAX_BLAST_RADIUS,
+    REMEDIATION_CACHE_DIRS, REMEDIATION_LOGROTATE_CONFIG, REMEDIATION_PROTECTED_PROCESSES
+)
+from metrics_collector import METRIC_DEFINITIONS, METRICS, MetricsSnapshot
+from agent_metrics import REMEDIATION_RECOVERY_DURATION
+from tracing import span, traced
+
+
+@dataclass
+class CommandResult:
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+
+
+def run_command(command: List[str], timeout: float) -> CommandResult:
+    program = command[1] if command[0] == 'sudo' and len(command) > 1 else command[0]
+    try:
+        with span(f"exec.{os.path.basename(program)}"):
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return CommandResult(124, stderr=f"{' '.join(command)} timed out after {timeout}s")
+    except Exception as e:
+        return CommandResult(1, stderr=str(e))
+    return CommandResult(result.returncode, result.stdout, result.stderr)
+
+
+class SystemctlRunner:
+    def __init__(self, command: Optional[List[str]] = None):
+        self.command = command or ['sudo', 'systemctl']
+
+    def run(self, args: List[str], timeout: float) -> CommandResult:
+        return run_command(self.command + args, timeout)
+
+    def restart(self, unit: str, timeout: float) -> CommandResult:
+        return self.run(['restart', unit], timeout)
+
+    def is_active(self, unit: str, timeout: float) -> str:
+        return self.run(['is-active', unit], timeout).stdout.strip() or "unknown"
+
+
+def within_thresholds(snapshot: MetricsSnapshot, names: Optional[Iterable[str]] = None) -> bool:
+    observed = snapshot.observed()
+    if names is None:
+        return all(
+            observed[definition.name] <= definition.threshold
+            for definition in METRIC_DEFINITIONS
+            if definition.name in observed
+        )
+    return all(name in observed and observed[name] <= METRICS[name].threshold for name in names)
+
+
+@dataclass
+class RecoveryReport:
+    unit: str
+    restarted: bool
+    service_status: str = "unknown"
+    error: str = ""
+    time_to_active: Optional[float] = None
+    time_to_recovery: Optional[float] = None
+    checks: int = 0
+    duration: float = 0.0
+    snapshot: Optional[MetricsSnapshot] = None
+
+    @property
+    def active(self) -> bool:
+        return self.time_to_active is not None
+
+    @property
+    def recovered(self) -> bool:
+        return self.time_to_recovery is not None
+
+    @property
+    def status(self) -> str:
+        return "SUCCESS" if self.restarted and self.active else "FAILED"
+
+
+class RemediationExecutor:
+    def __init__(self, runner=None, metrics: Optional[Callable[[Optional[List[str]]], MetricsSnapshot]] = None,
+                 healthy: Callable[[MetricsSnapshot, Optional[List[str]]], bool] = within_thresholds,
+                 restart_timeout=REMEDIATION_RESTART_TIMEOUT_SECONDS,
+                 recovery_deadline=REMEDIATION_RECOVERY_DEADLINE_SECONDS,
+                 initial_backoff=REMEDIATION_POLL_INITIAL_SECONDS, max_backoff=REMEDIATION_POLL_MAX_SECONDS):
+        self.runner = runner or SystemctlRunner()
+        self.metrics = metrics
+        self.healthy = healthy
+        self.restart_timeout = restart_timeout
+        self.recovery_deadline = recovery_deadline
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+    def restart(self, unit: str, watch: Optional[List[str]] = None, timeout: Optional[float] = None) -> RecoveryReport:
+        started = time.monotonic()
+        deadline = started + (self.recovery_deadline if timeout is None else min(self.recovery_deadline, timeout))
+        result = self.runner.restart(unit, self.restart_timeout if timeout is None else min(self.restart_timeout, timeout))
+        report = RecoveryReport(unit=unit, restarted=result.returncode == 0)
+        if not report.restarted:
+            report.error = result.stderr.strip() or f"exit code {result.returncode}"
+            report.duration = time.monotonic() - started
+            return report
+
+        delay = self.initial_backoff
+        while True:
+            report.checks += 1
+            if not report.active:
+                report.service_status = self.runner.is_active(unit, max(deadline - time.monotonic(), 1.0))
+                if report.service_status == "active":
+                    report.time_to_active = time.monotonic() - started
+            if report.active:
+                if self.metrics is None:
+                    report.time_to_recovery = report.time_to_active
+                    break
+                report.snapshot = self.metrics(watch)
+                if self.healthy(report.snapshot, watch):
+                    report.time_to_recovery = time.monotonic() - started
+                    break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.max_backoff)
+
+        report.duration = time.monotonic() - started
+        if report.recovered:
+            REMEDIATION_RECOVERY_DURATION.labels(unit).observe(report.time_to_recovery)
+        return report
+
+
+BLAST_RADIUS = ('process', 'service', 'host')
+
+
+@dataclass(frozen=True)
+class RemediationAction:
+    name: str
+    kind: str
+    target: str
+    cost: int
+    blast_radius: str
+    timeout: float
+
+    @property
+    def lock_key(self) -> str:
+        return f"{self.kind}:{self.target}"
+
+    def describe(self) -> str:
+        return f"{self.name} (cost {self.cost}, blast radius {self.blast_radius})"
+
+
+@dataclass
+class ActionResult:
+    action: RemediationAction
+    success: bool
+    detail: str = ""
+    duration: float = 0.0
+    report: Optional[RecoveryReport] = None
+
+    @property
+    def status(self) -> str:
+        return "SUCCESS" if self.success else "FAILED"
+
+
+class ActionExecutor:
+    def __init__(self, recovery=None, cache_dirs=REMEDIATION_CACHE_DIRS,
+                 protected_processes=REMEDIATION_PROTECTED_PROCESSES):
+        self.recovery = recovery or RemediationExecutor()
+        self.cache_dirs = list(cache_dirs)
+        self.protected_processes = set(protected_processes)
+
+    def restart_unit(self, target: str, watch: List[str] = (),
+                     timeout: Optional[float] = None) -> Tuple[bool, str, Optional[RecoveryReport]]:
+        report = self.recovery.restart(target, list(watch), timeout)
+        if not report.restarted:
+            return False, report.error, report
+        recovery = f"recovered in {report.time_to_recovery:.1f}s" if report.recovered else "metrics not recovered"
+        return report.active, f"{target} is {report.service_status}, {recovery}", report
+
+    def clear_cache(self, target: str, watch: List[str] = (), timeout: Optional[float] = None) -> Tuple[bool, str, None]:
+        if target not in self.cache_dirs:
+            return False, f"{target} is not an allowed cache directory", None
+        freed = 0
+        for entry in os.scandir(target):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    freed += sum(
+                        os.path.getsize(os.path.join(root, name))
+                        for root, _, names in os.walk(entry.path) for name in names
+                    )
+                    shutil.rmtree(entry.path)
+                else:
+                    freed += entry.stat(follow_symlinks=False).st_size
+                    os.unlink(entry.path)
+            except OSError:
+                continue
+        return True, f"freed {freed / 1024 / 1024:.1f} MB from {target}", None
+
+    def rotate_logs(self, target: str, watch: List[str] = (), timeout: Optional[float] = None) -> Tuple[bool, str, None]:
+        result = run_command(['sudo', 'logrotate', '--force', target], timeout or REMEDIATION_RESTART_TIMEOUT_SECONDS)
+        return result.returncode == 0, result.stderr.strip() or f"rotated logs using {target}", None
+
+    def kill_top_process(self, target: str, watch: List[str] = (), timeout: Optional[float] = None) -> Tuple[bool, str, None]:
+        attribute = 'memory_percent' if target == 'memory' else 'cpu_percent'
+        own_pids = {os.getpid(), os.getppid(), 1}
+        candidates = [
+            process for process in psutil.process_iter(['pid', 'name'])
+            if process.info['pid'] not in own_pids and process.info['name'] not in self.protected_processes
+        ]
+        if attribute == 'cpu_percent':
+            for process in candidates:
+                try:
+                    process.cpu_percent(None)
+                except psutil.Error:
+                    pass
+            time.sleep(0.5)
+
+        usage = []
+        for process in candidates:
+            try:
+                usage.append((getattr(process, attribute)(), process))
+            except psutil.Error:
+                continue
+        if not usage:
+            return False, "no eligible process found", None
+
+        value, process = max(usage, key=lambda item: item[0])
+        try:
+            process.terminate()
+            process.wait(timeout=min(5, timeout) if timeout else 5)
+        except psutil.TimeoutExpired:
+            process.kill()
+        except psutil.Error as e:
+            return False, f"could not stop {process.info['name']} ({process.pid}): {e}", None
+        return True, f"stopped {process.info['name']} ({process.pid}) using {value:.1f}% {target}", None
+
+
+class ActionRegistry:
+    def __init__(self, max_blast_radius=REMEDIATION_MAX_BLAST_RADIUS):
+        self.max_blast_radius = max_blast_radius
+        self.actions: Dict[str, List[RemediationAction]] = {}
+
+    def register(self, issue: str, action: RemediationAction):
+        self.actions.setdefault(issue, []).append(action)
+        self.actions[issue].sort(key=lambda registered: registered.cost)
+
+    def allowed(self, action: RemediationAction) -> bool:
+        return BLAST_RADIUS.index(action.blast_radius) <= BLAST_RADIUS.index(self.max_blast_radius)
+
+    def plan(self, issues: Iterable[str]) -> Dict[RemediationAction, List[str]]:
+        by_target = {}
+        planned = {}
+        for issue in issues:
+            action = next((action for action in self.actions.get(issue, []) if self.allowed(action)), None)
+            if action is not None:
+                action = by_target.setdefault(action.lock_key, action)
+                planned.setdefault(action, []).append(issue)
+        return planned
+
+
+class ActionRunner:
+    def __init__(self, executor=None, max_workers=4):
+        self.executor = executor or ActionExecutor()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='remediation-action')
+        self.locks: Dict[str, threading.Lock] = {}
+        self.locks_guard = threading.Lock()
+
+    def lock(self, key: str) -> threading.Lock:
+        with self.locks_guard:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def _execute(self, action: RemediationAction, watch: List[str], lock: threading.Lock) -> ActionResult:
+        started = time.monotonic()
+        try:
+            success, detail, report = getattr(self.executor, action.kind)(action.target, watch, action.timeout)
+            return ActionResult(action, success, detail, time.monotonic() - started, report)
+        except Exception as e:
+            return ActionResult(action, False, str(e), time.monotonic() - started)
+        finally:
+            lock.release()
+
+    @traced('remediation.actions')
+    def run(self, plan: Dict[RemediationAction, List[str]]) -> List[ActionResult]:
+        started = time.monotonic()
+        submitted = []
+        results = []
+        for action, watch in plan.items():
+            lock = self.lock(action.lock_key)
+            if not lock.acquire(blocking=False):
+                results.append(ActionResult(action, False, f"{action.lock_key} is already being remediated"))
+                continue
+            submitted.append((action, self.pool.submit(contextvars.copy_context().run, self._execute, action, watch, lock)))
+
+        for action, future in submitted:
+            remaining = max(started + action.timeout - time.monotonic(), 0)
+            try:
+                results.append(future.result(timeout=remaining))
+            except FutureTimeout:
+                results.append(ActionResult(action, False, f"timed out after {action.timeout}s", action.timeout))
+        return results
+
+
+def default_registry() -> ActionRegistry:
+    restart_timeout = REMEDIATION_RESTART_TIMEOUT_SECONDS + REMEDIATION_RECOVERY_DEADLINE_SECONDS
+    restart_service = RemediationAction(
+        f"Restart {REMEDIATION_SERVICE}", 'restart_unit', REMEDIATION_SERVICE, 2, 'service', restart_timeout
+    )
+    registry = ActionRegistry()
+    registry.register('cpu', restart_service)
+    registry.register('cpu', RemediationAction("Stop top CPU process", 'kill_top_process', 'cpu', 3, 'process', 10))
+    registry.register('memory', restart_service)
+    registry.register('memory', RemediationAction("Stop top memory process", 'kill_top_process', 'memory', 3, 'process', 10))
+    registry.register('network', restart_service)
+    registry.register('disk', RemediationAction(
+        "Force log rotation", 'rotate_logs', REMEDIATION_LOGROTATE_CONFIG, 1, 'service', REMEDIATION_RESTART_TIMEOUT_SECONDS
+    ))
+    for cache_dir in REMEDIATION_CACHE_DIRS:
+        registry.register('disk', RemediationAction(f"Clear {cache_dir}", 'clear_cache', cache_dir, 2, 'service', 60))
+    return registry
@@ -0,0 +1,166 @@
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+from config import SCHEDULER_OVERRUN_POLICY, SCHEDULER_ANALYSIS_WORKERS, SCHEDULER_REPORT_INTERVAL_SECONDS
+from agent_metrics import LATENCY_BUCKETS, CYCLE_DURATION
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return self.max
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 2),
+            'p95_ms': round(self.quantile(0.95) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2)
+        }
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+        CYCLE_DURATION.labels(stage).observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - started)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {stage: histogram.as_dict() for stage, histogram in self.stages.items()}
+
+
+class CycleScheduler:
+    def __init__(self, interval: float, tick: Callable[[], Any], analyze: Optional[Callable[[Any], None]] = None,
+                 overrun=SCHEDULER_OVERRUN_POLICY, workers=SCHEDULER_ANALYSIS_WORKERS, timer=None,
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 on_report: Optional[Callable[[Dict], None]] = None,
+                 report_interval=SCHEDULER_REPORT_INTERVAL_SECONDS):
+        self.interval = interval
+        self.tick = tick
+        self.analyze = analyze
+        self.overrun = overrun
+        self.workers = workers
+        self.timer = timer or StageTimer()
+        self.on_error = on_error or (lambda error: None)
+        self.on_report = on_report
+        self.report_interval = report_interval
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analysis')
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.pending = None
+        self.ticks = 0
+        self.skipped_ticks = 0
+        self.analyses = 0
+        self.coalesced = 0
+        self.skipped_analyses = 0
+
+    def submit(self, work: Any):
+        with self.lock:
+            if self.in_flight < self.workers:
+                self.in_flight += 1
+                self.pool.submit(self._analyze, work)
+            elif self.overrun == 'coalesce':
+                if self.pending is not None:
+                    self.coalesced += 1
+                self.pending = work
+            else:
+                self.skipped_analyses += 1
+
+    def _analyze(self, work: Any):
+        while work is not None:
+            try:
+                with self.timer.time('analysis'):
+                    self.analyze(work)
+            except Exception as e:
+                self.on_error(e)
+            with self.lock:
+                self.analyses += 1
+                work, self.pending = self.pending, None
+                if work is None:
+                    self.in_flight -= 1
+
+    def run(self, max_ticks: Optional[int] = None):
+        next_tick = time.monotonic()
+        last_report = next_tick
+        while not self.stop_event.is_set():
+            self.timer.observe('schedule_lag', max(time.monotonic() - next_tick, 0.0))
+            with self.timer.time('tick'):
+                try:
+                    work = self.tick()
+                except Exception as e:
+                    self.on_error(e)
+                    work = None
+            if work and self.analyze:
+                self.submit(work)
+            self.ticks += 1
+
+            now = time.monotonic()
+            if self.on_report and now - last_report >= self.report_interval:
+                self.on_report(self.stats())
+                last_report = now
+            if max_ticks and self.ticks >= max_ticks:
+                break
+
+            next_tick += self.interval
+            if now > next_tick:
+                missed = int((now - next_tick) // self.interval) + 1
+                self.skipped_ticks += missed
+                next_tick += missed * self.interval
+            self.stop_event.wait(max(next_tick - time.monotonic(), 0.0))
+
+    def stop(self, wait: bool = False):
+        self.stop_event.set()
+        self.pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                'ticks': self.ticks,
+                'skipped_ticks': self.skipped_ticks,
+                'analyses': self.analyses,
+                'analyses_in_flight': self.in_flight,
+                'coalesced_analyses': self.coalesced,
+                'skipped_analyses': self.skipped_analyses,
+                'stages': self.timer.as_dict()
+            }
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from config import SPIKE_DURATION_SECONDS, SPIKE_TRACKING_FILE
+
+
+class SpikeTracker:
+    def __init__(self, path=SPIKE_TRACKING_FILE, spike_duration=SPIKE_DURATION_SECONDS):
+        self.path = path
+        self.spike_duration = spike_duration
+        self.lock = threading.RLock()
+        self.spike_times = self.load()
+
+    def load(self) -> Dict[str, float]:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save(self):
+        directory = os.path.dirname(self.path) or '.'
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.spike-tracking-', suffix='.json')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.spike_times, f)
+            os.replace(tmp_path, self.path)
+        except:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def check(self, metric_name: str, current_value: float, threshold: float, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        with self.lock:
+            if current_value > threshold:
+                if metric_name not in self.spike_times:
+                    self.spike_times[metric_name] = now
+                    self.save()
+                    return False
+                return now - self.spike_times[metric_name] >= self.spike_duration
+            if metric_name in self.spike_times:
+                del self.spike_times[metric_name]
+                self.save()
+            return False
+
+    def update(self, opened: Dict[str, float], cleared: Iterable[str]):
+        with self.lock:
+            changed = False
+            for metric_name, started in opened.items():
+                if metric_name not in self.spike_times:
+                    self.spike_times[metric_name] = started
+                    changed = True
+            for metric_name in cleared:
+                if self.spike_times.pop(metric_name, None) is not None:
+                    changed = True
+            if changed:
+                self.save()
+
+    def store(self, key: str, value):
+        with self.lock:
+            self.spike_times[key] = value
+            self.save()
+
+    def duration(self, metric_name: str, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        with self.lock:
+            if metric_name in self.spike_times:
+                return int(now - self.spike_times[metric_name])
+            return 0
+
+    def is_tracking(self, metric_name: str) -> bool:
+        with self.lock:
+            return metric_name in self.spike_times
@@ -1,24 +1,21 @@
-import subprocess
-import time
-import signal
 import sys
+from load_generator import LoadGenerator, cpu_ramp
 
-def create_cpu_spike(duration=60):
+def create_cpu_spike(duration=60, peak=100.0):
     print(f"Creating CPU spike for {duration} seconds...")
-    process = subprocess.Popen(['stress', '--cpu', '2', '--timeout', str(duration)])
-    return process
+    return LoadGenerator([cpu_ramp(peak=peak, ramp_seconds=0, hold=duration)]).start()
 
-def stop_stress(process):
-    if process and process.poll() is None:
-        process.terminate()
+def stop_stress(generator):
+    if generator and generator.thread is not None and generator.thread.is_alive():
+        generator.stop()
         print("Stress test stopped")
 
 if __name__ == "__main__":
     duration = int(sys.argv[1]) if len(sys.argv) > 1 else 60
-    stress_process = create_cpu_spike(duration)
-    
+    stress_generator = create_cpu_spike(duration)
+
     try:
-        stress_process.wait()
+        stress_generator.wait()
     except KeyboardInterrupt:
-        stop_stress(stress_process)
+        stop_stress(stress_generator)
         print("Stress test interrupted")
@@ -0,0 +1,247 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from remediation import ActionExecutor, CommandResult
+
+
+class StubPrometheus:
+    def __init__(self, values=None, latency=0.0, host='127.0.0.1', port=0):
+        self.values = values or {}
+        self.latency = latency
+        self.requests = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def series(self, query):
+        value = self.values.get(query, 0.0)
+        if callable(value):
+            value = value(query)
+        if isinstance(value, list):
+            return value
+        return [({}, value)]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                url = urlparse(self.path)
+                query = parse_qs(url.query).get('query', [''])[0]
+                now = time.time()
+                result = [
+                    {"metric": labels, "value": [now, str(value)]}
+                    for labels, value in stub.series(query)
+                ]
+                body = json.dumps({
+                    "status": "success",
+                    "data": {"resultType": "vector", "result": result}
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubSlack:
+    def __init__(self, statuses=None, latency=0.0, retry_after=None, host='127.0.0.1', port=0):
+        self.statuses = list(statuses or [])
+        self.latency = latency
+        self.retry_after = retry_after
+        self.payloads = []
+        self.attempts = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/services/stub"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                with stub.lock:
+                    stub.attempts += 1
+                    status = stub.statuses.pop(0) if stub.statuses else 200
+                    if status == 200:
+                        stub.payloads.append(json.loads(body))
+                reply = b'ok' if status == 200 else b'error'
+                self.send_response(status)
+                if status == 429 and stub.retry_after is not None:
+                    self.send_header('Retry-After', str(stub.retry_after))
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class ScriptedSeries:
+    def __init__(self, baseline, steps=None, clock=time.monotonic):
+        self.baseline = baseline
+        self.steps = sorted(steps or [], key=lambda step: step[0])
+        self.clock = clock
+        self.started = None
+        self.resolved_at = None
+
+    def start(self, started=None):
+        self.started = self.clock() if started is None else started
+        self.resolved_at = None
+        return self
+
+    def elapsed(self):
+        return self.clock() - self.started if self.started is not None else 0.0
+
+    def resolve(self):
+        if self.resolved_at is None:
+            self.resolved_at = self.elapsed()
+
+    def value(self, elapsed):
+        for start, end, value in self.steps:
+            if self.resolved_at is not None and start <= self.resolved_at:
+                end = min(end, self.resolved_at)
+            if start <= elapsed < end:
+                return value(elapsed - start) if callable(value) else value
+        return self.baseline
+
+    def onset(self, threshold, duration, resolution=0.01):
+        elapsed = 0.0
+        while elapsed < duration:
+            if self.value(elapsed) > threshold:
+                return elapsed
+            elapsed += resolution
+        return None
+
+    def __call__(self, query):
+        return self.value(self.elapsed())
+
+
+class StubLLM:
+    RESPONSE = """Analysis:
+Scripted incident: the breached metric is driven by a single runaway workload.
+CONFIDENCE: High
+RECOMMENDATION: AUTO_REMEDIATE
+REASON: Deterministic benchmark response"""
+
+    def __init__(self, latency=0.0, response=RESPONSE, model='stub/deterministic'):
+        self.latency = latency
+        self.response = response
+        self.model = model
+        self.calls = 0
+        self.prompt_chars = 0
+        self.lock = threading.Lock()
+
+    def call(self, prompt):
+        with self.lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        return self.response
+
+
+class StubSystemctl:
+    def __init__(self, activation=0.0, on_restart=None):
+        self.activation = activation
+        self.on_restart = on_restart
+        self.restarts = []
+        self.restarted_at = {}
+
+    def restart(self, unit, timeout):
+        self.restarts.append(unit)
+        self.restarted_at[unit] = time.monotonic()
+        if self.on_restart:
+            self.on_restart(unit)
+        return CommandResult(0)
+
+    def is_active(self, unit, timeout):
+        restarted = self.restarted_at.get(unit)
+        if restarted is not None and time.monotonic() - restarted < self.activation:
+            return "activating"
+        return "active"
+
+
+class StubActionExecutor(ActionExecutor):
+    def __init__(self, recovery, on_action=None):
+        super().__init__(recovery, cache_dirs=[], protected_processes=[])
+        self.on_action = on_action
+        self.actions = []
+
+    def _simulate(self, kind, target):
+        self.actions.append((kind, target))
+        if self.on_action:
+            self.on_action(kind, target)
+        return True, f"simulated {kind} on {target}", None
+
+    def clear_cache(self, target, watch=(), timeout=None):
+        return self._simulate('clear_cache', target)
+
+    def rotate_logs(self, target, watch=(), timeout=None):
+        return self._simulate('rotate_logs', target)
+
+    def kill_top_process(self, target, watch=(), timeout=None):
+        return self._simulate('kill_top_process', target)
@@ -1,13 +1,20 @@
 from crewai.tools import tool
-import requests
-import subprocess
-import time
-import psutil
 import os
-import json
+import time
+from contextlib import contextmanager
 from crewai import LLM
-from config import CPU_THRESHOLD, MEMORY_THRESHOLD, DISK_THRESHOLD, NETWORK_THRESHOLD, SPIKE_DURATION_SECONDS
-from notifications import send_incident_alert, send_remediation_alert, send_comprehensive_incident_alert
+from config import SPIKE_DURATION_SECONDS, METRIC_HISTORY_WINDOW_SECONDS, ANOMALY_DETECTION_MODE, RCA_LOG_TEMPLATES, REMEDIATION_SERVICE
+from metrics_collector import PrometheusCollector, METRIC_DEFINITIONS, METRICS, RECOVERY_QUERIES, collect_psutil_snapshot
+from spike_tracker import SpikeTracker
+from detection import DetectionEngine
+from anomaly import AnomalyDetector
+from metric_history import open_history
+from journal import journal_collector
+from remediation import RemediationExecutor, ActionExecutor, ActionRunner, default_registry
+from rca_cache import RCACache, incident_fingerprint
+from notifications import send_incident_alert, send_remediation_alert, send_comprehensive_incident_alert, resolve_alerts
+from tracing import span
+from agent_metrics import track_tool, observe_llm_call, REMEDIATION_DECISIONS
 from logging_config import setup_logger
 
 logger = setup_logger('devops-agent')
@@ -17,94 +24,94 @@ llm = LLM(
     api_key=os.getenv("GEMINI_API_KEY")
 )
 
-SPIKE_TRACKING_FILE = "/tmp/devops_spike_tracking.json"
+spike_tracker = SpikeTracker()
+detection_engine = DetectionEngine(tracker=spike_tracker)
+anomaly_detector = AnomalyDetector(tracker=spike_tracker)
 
-def load_spike_times():
-    try:
-        with open(SPIKE_TRACKING_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return {}
-
-def save_spike_times(spike_times):
-    try:
-        with open(SPIKE_TRACKING_FILE, 'w') as f:
-            json.dump(spike_times, f)
-    except:
-        pass
+def evaluate_metrics(values, thresholds=None):
+    result = detection_engine.evaluate_target(values, thresholds=thresholds)
+    for _, metric_name in result.cleared:
+        resolve_alerts(metric_name)
+    return result
 
 def check_sustained_spike(metric_name, current_value, threshold):
-    current_time = time.time()
-    spike_times = load_spike_times()
-    
-    if current_value > threshold:
-        if metric_name not in spike_times:
-            spike_times[metric_name] = current_time
-            save_spike_times(spike_times)
-            return False
-        elif current_time - spike_times[metric_name] >= SPIKE_DURATION_SECONDS:
-            return True
-        else:
-            return False
-    else:
-        if metric_name in spike_times:
-            del spike_times[metric_name]
-            save_spike_times(spike_times)
-        return False
+    return metric_name in evaluate_metrics({metric_name: current_value}, {metric_name: threshold}).issues()
 
 def get_spike_duration(metric_name):
-    spike_times = load_spike_times()
-    if metric_name in spike_times:
-        return int(time.time() - spike_times[metric_name])
-    return 0
-
-def extract_metric_value(result_string):
+    return spike_tracker.duration(metric_name)
+
+def escalate_issues(detection, values):
+    static_issues = {name: detection.duration(name) for name in detection.issues()}
+    if ANOMALY_DETECTION_MODE == 'off':
+        return static_issues
+    anomalies = anomaly_detector.observe(values)
+    escalated = anomaly_detector.escalate(static_issues, anomalies, ANOMALY_DETECTION_MODE)
+    suppressed = [name for name in static_issues if name not in escalated]
+    if suppressed:
+        logger.info("Threshold breach within learned baseline, not escalating", extra={
+            'alert_type': 'tracking',
+            'metrics': {name: f"z={anomalies.scores[name]:.2f}" for name in suppressed}
+        })
+    return escalated
+
+def evaluate_snapshot(prometheus_data):
+    values = prometheus_data.observed()
+    detection = evaluate_metrics(values)
+    return detection, escalate_issues(detection, values)
+
+def detect_sustained_issues(prometheus_data):
+    return list(evaluate_snapshot(prometheus_data)[1])
+
+detection_handoff = None
+
+@contextmanager
+def use_detection(prometheus_data, detection, escalated):
+    global detection_handoff
+    detection_handoff = (prometheus_data, detection, escalated)
     try:
-        return float(result_string.split(': ')[1].rstrip('%'))
-    except:
-        return 0.0
+        yield
+    finally:
+        detection_handoff = None
+
+collector = PrometheusCollector()
+rca_cache = RCACache()
+metric_history = open_history()
 
 def get_prometheus_metrics():
-    try:
-        cpu_result = prometheus_monitor()
-        memory_result = memory_monitor()
-        disk_result = disk_monitor()
-        network_result = network_monitor()
-        
-        cpu_value = extract_metric_value(cpu_result)
-        memory_value = extract_metric_value(memory_result)
-        disk_value = extract_metric_value(disk_result)
-        network_value = extract_metric_value(network_result.replace(' Mbps', ''))
-        
-        return {
-            'cpu_result': cpu_result,
-            'memory_result': memory_result,
-            'disk_result': disk_result,
-            'network_result': network_result,
-            'cpu_value': cpu_value,
-            'memory_value': memory_value,
-            'disk_value': disk_value,
-            'network_value': network_value
-        }
-    except Exception as e:
-        cpu_usage = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        network = psutil.net_io_counters()
-        
-        return {
-            'cpu_result': f"CPU {'spike detected' if cpu_usage > CPU_THRESHOLD else 'normal'}: {cpu_usage:.2f}%",
-            'memory_result': f"Memory {'spike detected' if memory.percent > MEMORY_THRESHOLD else 'normal'}: {memory.percent:.2f}%",
-            'disk_result': f"Disk {'spike detected' if disk.percent > DISK_THRESHOLD else 'normal'}: {disk.percent:.2f}%",
-            'network_result': f"Network normal: {network.bytes_sent/1024/1024:.2f} MB sent",
-            'cpu_value': cpu_usage,
-            'memory_value': memory.percent,
-            'disk_value': disk.percent,
-            'network_value': network.bytes_sent/1024/1024
-        }
+    snapshot = collector.collect()
+    if snapshot.failed():
+        snapshot = collect_psutil_snapshot()
+    metric_history.record(snapshot)
+    return snapshot
+
+recovery_collector = PrometheusCollector(queries=RECOVERY_QUERIES)
+
+def get_recovery_metrics(names=None):
+    snapshot = recovery_collector.collect(names)
+    if snapshot.failed():
+        snapshot = collect_psutil_snapshot()
+    return snapshot
+
+remediation_executor = RemediationExecutor(metrics=get_recovery_metrics)
+remediation_registry = default_registry()
+action_runner = ActionRunner(ActionExecutor(remediation_executor))
+
+def format_metric_history(window=METRIC_HISTORY_WINDOW_SECONDS):
+    summary = metric_history.summary(window)
+    if not summary:
+        return "No metric history available"
+    lines = []
+    for name, stats in summary.items():
+        unit = METRICS[name].unit
+        lines.append(
+            f"- {METRICS[name].label}: min {stats['min']:.2f}{unit}, p50 {stats['p50']:.2f}{unit}, "
+            f"p95 {stats['p95']:.2f}{unit}, max {stats['max']:.2f}{unit} ({stats['samples']} samples)"
+        )
+    return "\n".join(lines)
 
 def generate_root_cause_analysis(metrics, issues, system_logs=""):
     try:
+        log_context = "\n".join(system_logs.splitlines()[:RCA_LOG_TEMPLATES]) if system_logs else "No recent logs available"
         prompt = f"""
 Analyze the following system metrics and provide a concise root cause analysis with confidence assessment:
 
@@ -116,8 +123,11 @@ System Metrics:
 
 Issues Detected: {', '.join(issues)}
 
-System Logs (Recent):
-{system_logs[:500] if system_logs else "No recent logs available"}
+Metric History (last {METRIC_HISTORY_WINDOW_SECONDS // 60} minutes):
+{format_metric_history()}
+
+System Log Templates (most severe and frequent first, <*> marks variable fields):
+{log_context}
 
 Provide analysis (max 150 words) with:
 1. Most likely cause of the issues
@@ -137,7 +147,13 @@ Confidence Guidelines:
 Do not use markdown formatting, asterisks, or headers in your response.
 """
         
-        response = llm.call(prompt)
+        started = time.monotonic()
+        response = None
+        try:
+            with span('llm.call'):
+                response = llm.call(prompt)
+        finally:
+            observe_llm_call(llm.model, prompt, response, time.monotonic() - started)
         return response.strip()
     except Exception as e:
         return f"Root cause analysis failed: {str(e)}", False
@@ -167,112 +183,71 @@ def parse_confidence_decision(analysis_text):
     except Exception as e:
         return analysis_text, False, "Low", f"Parsing error: {str(e)}"
 
+def analyze_incident(metrics, issues, system_logs=""):
+    fingerprint = incident_fingerprint(metrics, issues, system_logs)
+    cached = rca_cache.get(fingerprint)
+    if cached:
+        logger.info("Root cause analysis served from cache", extra={
+            'alert_type': 'analysis',
+            'confidence': cached[2],
+            'metrics': rca_cache.stats()
+        })
+        return cached
+    
+    root_cause = generate_root_cause_analysis(metrics, issues, system_logs)
+    decision = parse_confidence_decision(root_cause)
+    if isinstance(root_cause, str):
+        rca_cache.put(fingerprint, decision)
+    return decision
+
 @tool
+@track_tool
 def prometheus_monitor():
     """Query Prometheus for CPU metrics and detect spikes"""
-    try:
-        response = requests.get('http://localhost:9090/api/v1/query?query=100-(avg(rate(node_cpu_seconds_total{mode="idle"}[5m]))*100)')
-        data = response.json()
-        cpu_usage = float(data['data']['result'][0]['value'][1])
-        
-        if cpu_usage > CPU_THRESHOLD:
-            return f"CPU spike detected: {cpu_usage:.2f}%"
-        return f"CPU normal: {cpu_usage:.2f}%"
-    except Exception as e:
-        return f"Error monitoring CPU: {str(e)}"
+    return collector.collect(['cpu']).cpu_result
 
 @tool
+@track_tool
 def memory_monitor():
     """Query Prometheus for memory metrics and detect high usage"""
-    try:
-        response = requests.get('http://localhost:9090/api/v1/query?query=100*(1-node_memory_MemAvailable_bytes/node_memory_MemTotal_bytes)')
-        data = response.json()
-        memory_usage = float(data['data']['result'][0]['value'][1])
-        
-        if memory_usage > MEMORY_THRESHOLD:
-            return f"Memory spike detected: {memory_usage:.2f}%"
-        return f"Memory normal: {memory_usage:.2f}%"
-    except Exception as e:
-        return f"Error monitoring memory: {str(e)}"
+    return collector.collect(['memory']).memory_result
 
 @tool
+@track_tool
 def disk_monitor():
     """Query Prometheus for disk metrics and detect high usage"""
-    try:
-        response = requests.get('http://localhost:9090/api/v1/query?query=100*(1-node_filesystem_avail_bytes{mountpoint="/"}/node_filesystem_size_bytes{mountpoint="/"})')
-        data = response.json()
-        disk_usage = float(data['data']['result'][0]['value'][1])
-        
-        if disk_usage > DISK_THRESHOLD:
-            return f"Disk spike detected: {disk_usage:.2f}%"
-        return f"Disk normal: {disk_usage:.2f}%"
-    except Exception as e:
-        return f"Error monitoring disk: {str(e)}"
+    return collector.collect(['disk']).disk_result
 
 @tool
+@track_tool
 def network_monitor():
     """Query Prometheus for network metrics and detect high usage"""
-    try:
-        response = requests.get('http://localhost:9090/api/v1/query?query=rate(node_network_transmit_bytes_total{device="ens5"}[5m])*8/1000000')
-        data = response.json()
-        network_usage = float(data['data']['result'][0]['value'][1]) if data['data']['result'] else 0
-        
-        if network_usage > NETWORK_THRESHOLD:
-            return f"Network spike detected: {network_usage:.2f} Mbps"
-        return f"Network normal: {network_usage:.2f} Mbps"
-    except Exception as e:
-        return f"Error monitoring network: {str(e)}"
+    return collector.collect(['network']).network_result
 
 @tool
+@track_tool
 def system_overview():
     """Get comprehensive system metrics overview and send Slack alerts if issues detected"""
     try:
-        prometheus_data = get_prometheus_metrics()
+        if detection_handoff is not None:
+            prometheus_data, detection, escalated = detection_handoff
+        else:
+            prometheus_data = get_prometheus_metrics()
+            detection, escalated = evaluate_snapshot(prometheus_data)
         
         overview = f"""
 System Overview:
-{prometheus_data['cpu_result']}
-{prometheus_data['memory_result']}
-{prometheus_data['disk_result']}
-{prometheus_data['network_result']}
+{prometheus_data.cpu_result}
+{prometheus_data.memory_result}
+{prometheus_data.disk_result}
+{prometheus_data.network_result}
 """
         
-        issues = []
-        metrics = {
-            'cpu': f"{prometheus_data['cpu_value']:.2f}%",
-            'memory': f"{prometheus_data['memory_value']:.2f}%",
-            'disk': f"{prometheus_data['disk_value']:.2f}%",
-            'network': f"{prometheus_data['network_value']:.2f} MB"
-        }
+        metrics = prometheus_data.formatted()
         
-        sustained_issues = []
-        
-        if check_sustained_spike('cpu', prometheus_data['cpu_value'], CPU_THRESHOLD):
-            issues.append("CPU")
-            sustained_issues.append(f"CPU (sustained {get_spike_duration('cpu')}s)")
-            
-        if check_sustained_spike('memory', prometheus_data['memory_value'], MEMORY_THRESHOLD):
-            issues.append("Memory")
-            sustained_issues.append(f"Memory (sustained {get_spike_duration('memory')}s)")
-            
-        if check_sustained_spike('disk', prometheus_data['disk_value'], DISK_THRESHOLD):
-            issues.append("Disk")
-            sustained_issues.append(f"Disk (sustained {get_spike_duration('disk')}s)")
-            
-        if check_sustained_spike('network', prometheus_data['network_value'], NETWORK_THRESHOLD):
-            issues.append("Network")
-            sustained_issues.append(f"Network (sustained {get_spike_duration('network')}s)")
-        
-        current_spikes = []
-        spike_times = load_spike_times()
-        if prometheus_data['cpu_value'] > CPU_THRESHOLD and 'cpu' in spike_times and 'CPU' not in issues:
-            current_spikes.append(f"CPU tracking ({get_spike_duration('cpu')}s)")
-        if prometheus_data['memory_value'] > MEMORY_THRESHOLD and 'memory' in spike_times and 'Memory' not in issues:
-            current_spikes.append(f"Memory tracking ({get_spike_duration('memory')}s)")
-        if prometheus_data['disk_value'] > DISK_THRESHOLD and 'disk' in spike_times and 'Disk' not in issues:
-            current_spikes.append(f"Disk tracking ({get_spike_duration('disk')}s)")
-        if prometheus_data['network_value'] > NETWORK_THRESHOLD and 'network' in spike_times and 'Network' not in issues:
-            current_spikes.append(f"Network tracking ({get_spike_duration('network')}s)")
+        issues = [METRICS[name].label for name in escalated]
+        sustained_issues = [f"{METRICS[name].label} (sustained {duration}s)" for name, duration in escalated.items()]
+        current_spikes = [f"{METRICS[name].label} tracking ({detection.duration(name)}s)" for name in detection.tracking()]
         
         if issues:
             overview += f"\nSUSTAINED ISSUES DETECTED: {', '.join(sustained_issues)}"
@@ -280,18 +255,12 @@ System Overview:
             logger.error("Sustained issues detected", extra={
                 'alert_type': 'incident',
                 'metrics': metrics,
-                'duration': max([get_spike_duration(issue.lower()) for issue in issues])
+                'duration': max(escalated.values())
             })
             
-            try:
-                result = subprocess.run(['journalctl', '--since', '5 minutes ago', '--no-pager'], 
-                                      capture_output=True, text=True)
-                system_logs = result.stdout
-            except:
-                system_logs = ""
+            system_logs = journal_collector.excerpt().text
             
-            root_cause = generate_root_cause_analysis(metrics, issues, system_logs)
-            analysis_text, should_auto_remediate, confidence, reason = parse_confidence_decision(root_cause)
+            analysis_text, should_auto_remediate, confidence, reason = analyze_incident(metrics, issues, system_logs)
             
             metrics['confidence'] = confidence
             metrics['auto_remediate'] = "Yes" if should_auto_remediate else "No"
@@ -321,116 +290,133 @@ System Overview:
     except Exception as e:
         return f"Error getting system overview: {str(e)}"
 
-@tool 
+@tool
+@track_tool
 def log_analyzer():
     """Retrieve and analyze system logs for root cause"""
-    try:
-        result = subprocess.run(['journalctl', '--since', '5 minutes ago', '--no-pager'], 
-                              capture_output=True, text=True)
-        logs = result.stdout
-        return f"Recent logs retrieved: {len(logs)} characters. Content: {logs[:500]}"
-    except Exception as e:
-        return f"Error retrieving logs: {str(e)}"
+    excerpt = journal_collector.excerpt()
+    if excerpt.error:
+        return excerpt.summary()
+    return f"{excerpt.summary()}. Content:\n{excerpt.text}"
+
+def breached_metrics(snapshot):
+    return [definition.name for definition in METRIC_DEFINITIONS if snapshot.value(definition.name) > definition.threshold]
+
+def post_remediation_snapshot(snapshot, watch, reports):
+    post_data, refreshed = snapshot, set()
+    for report in reports:
+        if report is not None and report.snapshot is not None:
+            post_data = post_data.merged(report.snapshot)
+            refreshed.update(report.snapshot.observed())
+    stale = [name for name in watch if name not in refreshed]
+    if stale:
+        post_data = post_data.merged(get_recovery_metrics(stale))
+    return post_data
+
+def remediate_docker(snapshot=None):
+    pre_data = snapshot or get_prometheus_metrics()
+    pre_metrics = pre_data.formatted()
+    watch = breached_metrics(pre_data)
+    report = remediation_executor.restart(REMEDIATION_SERVICE, watch)
+    if not report.restarted:
+        return f"Restart failed: {report.error}", report, pre_metrics
+
+    post_data = post_remediation_snapshot(pre_data, watch, [report])
+    post_metrics = post_data.formatted()
+    if report.recovered:
+        recovery = f"{report.time_to_recovery:.1f}s"
+        stability = "VERIFIED"
+    else:
+        recovery = f"not recovered within {remediation_executor.recovery_deadline}s"
+        stability = "DEGRADED - metrics still above threshold" if report.active else "FAILED - service not active"
+
+    logger.info("Remediation health check completed", extra={
+        'alert_type': 'remediation',
+        'duration': round(report.duration, 3),
+        'metrics': {
+            'service_status': report.service_status,
+            'time_to_active': round(report.time_to_active, 3) if report.active else None,
+            'time_to_recovery': round(report.time_to_recovery, 3) if report.recovered else None,
+            'checks': report.checks
+        }
+    })
+
+    verification_report = f"""
+Service Restart: {report.status}
+Docker Status: {report.service_status}
+Time to Recovery: {recovery} ({report.checks} health checks)
+Post-restart System Status:
+{post_data.cpu_result}
+{post_data.memory_result}
+{post_data.disk_result}
+{post_data.network_result}
+System Stability: {stability}
+"""
+
+    send_remediation_alert(f"{report.status} - Docker restarted", pre_metrics, post_metrics)
+    return verification_report, report, post_metrics
+
+def remediate_issues(metric_names, snapshot):
+    pre_metrics = snapshot.formatted()
+    plan = remediation_registry.plan(metric_names)
+    if not plan:
+        return (
+            "No remediation action registered for the detected issues",
+            "SKIPPED - No applicable remediation action", pre_metrics, "No automatic action available"
+        )
+
+    results = action_runner.run(plan)
+    for result in results:
+        logger.info("Remediation action completed", extra={
+            'alert_type': 'remediation',
+            'duration': round(result.duration, 3),
+            'metrics': {'action': result.action.name, 'status': result.status, 'detail': result.detail}
+        })
+
+    post_metrics = post_remediation_snapshot(snapshot, metric_names, [result.report for result in results]).formatted()
+    succeeded = [result for result in results if result.success]
+    status = "SUCCESS" if len(succeeded) == len(results) else "PARTIAL" if succeeded else "FAILED"
+    action_taken = ', '.join(f"{result.action.name} ({result.status})" for result in results)
+
+    action_lines = '\n'.join(
+        f"- {result.action.describe()}: {result.status} - {result.detail} ({result.duration:.1f}s)" for result in results
+    )
+    remediation_report = f"""
+Remediation Actions: {status}
+{action_lines}
+"""
+    send_remediation_alert(f"{status} - {action_taken}", pre_metrics, post_metrics)
+    return remediation_report, status, post_metrics, action_taken
 
 @tool
+@track_tool
 def system_remediation():
     """Restart services and verify system health with Slack notifications"""
     try:
-        cpu_usage = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        network = psutil.net_io_counters()
-        
-        pre_metrics = {
-            'cpu': f"{cpu_usage:.2f}%",
-            'memory': f"{memory.percent:.2f}%",
-            'disk': f"{disk.percent:.2f}%",
-            'network': f"{network.bytes_sent/1024/1024:.2f} MB"
-        }
-        
-        restart_result = subprocess.run(['sudo', 'systemctl', 'restart', 'docker'], 
-                                      capture_output=True, text=True)
-        
-        if restart_result.returncode != 0:
-            return f"Restart failed: {restart_result.stderr}"
-        
-        time.sleep(5)
-        
-        status_result = subprocess.run(['sudo', 'systemctl', 'is-active', 'docker'], 
-                                     capture_output=True, text=True)
-        service_status = status_result.stdout.strip()
-        
-        cpu_usage = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        network = psutil.net_io_counters()
-        
-        post_metrics = {
-            'cpu': f"{cpu_usage:.2f}%",
-            'memory': f"{memory.percent:.2f}%",
-            'disk': f"{disk.percent:.2f}%",
-            'network': f"{network.bytes_sent/1024/1024:.2f} MB"
-        }
-        
-        post_overview = f"""
-System Overview:
-CPU: {cpu_usage:.2f}%
-Memory: {memory.percent:.2f}%
-Disk: {disk.percent:.2f}%
-Network: {network.bytes_sent/1024/1024:.2f} MB sent
-"""
-        
-        verification_report = f"""
-Service Restart: SUCCESS
-Docker Status: {service_status}
-Post-restart System Status:
-{post_overview}
-System Stability: VERIFIED
-"""
-        
-        send_remediation_alert("SUCCESS - Docker restarted", pre_metrics, post_metrics)
-        
+        verification_report, _, _ = remediate_docker()
         return verification_report
-        
     except Exception as e:
         return f"Error during remediation: {str(e)}"
 
 @tool
+@track_tool
 def confidence_based_remediation():
     """Check AI confidence and perform remediation only if confidence is high enough"""
     try:
-        prometheus_data = get_prometheus_metrics()
-        issues = []
-        metrics = {
-            'cpu': f"{prometheus_data['cpu_value']:.2f}%",
-            'memory': f"{prometheus_data['memory_value']:.2f}%",
-            'disk': f"{prometheus_data['disk_value']:.2f}%",
-            'network': f"{prometheus_data['network_value']:.2f} MB"
-        }
-        
-        if prometheus_data['cpu_value'] > CPU_THRESHOLD:
-            issues.append("CPU")
-        if prometheus_data['memory_value'] > MEMORY_THRESHOLD:
-            issues.append("Memory")
-        if prometheus_data['disk_value'] > DISK_THRESHOLD:
-            issues.append("Disk")
-        if prometheus_data['network_value'] > NETWORK_THRESHOLD:
-            issues.append("Network")
+        prometheus_data = detection_handoff[0] if detection_handoff is not None else get_prometheus_metrics()
+        metrics = prometheus_data.formatted()
+        breached = breached_metrics(prometheus_data)
+        issues = [METRICS[name].label for name in breached]
         
         if not issues:
             return "No issues detected - remediation not needed"
         
-        try:
-            result = subprocess.run(['journalctl', '--since', '5 minutes ago', '--no-pager'], 
-                                  capture_output=True, text=True)
-            system_logs = result.stdout
-        except:
-            system_logs = ""
+        system_logs = journal_collector.excerpt().text
         
-        root_cause = generate_root_cause_analysis(metrics, issues, system_logs)
-        analysis_text, should_auto_remediate, confidence, reason = parse_confidence_decision(root_cause)
+        analysis_text, should_auto_remediate, confidence, reason = analyze_incident(metrics, issues, system_logs)
         
         if should_auto_remediate:
+            REMEDIATION_DECISIONS.labels('auto_remediate').inc()
             logger.info("Starting automatic remediation", extra={
                 'alert_type': 'remediation',
                 'confidence': confidence,
@@ -438,15 +424,9 @@ def confidence_based_remediation():
             })
             
             pre_metrics = metrics.copy()
-            remediation_result = system_remediation()
-            
-            post_prometheus_data = get_prometheus_metrics()
-            post_metrics = {
-                'cpu': f"{post_prometheus_data['cpu_value']:.2f}%",
-                'memory': f"{post_prometheus_data['memory_value']:.2f}%",
-                'disk': f"{post_prometheus_data['disk_value']:.2f}%",
-                'network': f"{post_prometheus_data['network_value']:.2f} MB"
-            }
+            remediation_result, status, post_metrics, action_taken = remediate_issues(
+                breached, prometheus_data
+            )
             
             metrics['confidence'] = confidence
             metrics['decision_reason'] = reason
@@ -460,10 +440,10 @@ def confidence_based_remediation():
                 incident_metrics=metrics,
                 issues=issues,
                 root_cause_analysis=analysis_text,
-                remediation_status="SUCCESS" if "SUCCESS" in remediation_result else "FAILED",
+                remediation_status=status,
                 pre_metrics=pre_metrics,
                 post_metrics=post_metrics,
-                action_taken="Docker service restarted automatically"
+                action_taken=action_taken
             )
             
             return f"""
@@ -477,6 +457,7 @@ AI Assessment:
 {remediation_result}
 """
         else:
+            REMEDIATION_DECISIONS.labels('human_escalation').inc()
             metrics['confidence'] = confidence
             metrics['decision_reason'] = reason
             
@@ -0,0 +1,192 @@
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+from config import (
+    TRACING_ENABLED, PROFILE_SLOW_CYCLES, PROFILE_SLOW_CYCLE_SECONDS, PROFILE_SAMPLE_INTERVAL_SECONDS, PROFILE_DIR
+)
+from logging_config import setup_logger
+
+logger = setup_logger('trace')
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+class CycleTrace:
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: Dict[str, list] = {}
+        self.depth = 0
+        self.traced = 0.0
+
+    def record(self, name: str, seconds: float, depth: int):
+        totals = self.spans.get(name)
+        if totals is None:
+            totals = self.spans[name] = [0.0, 0]
+        totals[0] += seconds
+        totals[1] += 1
+        if depth == 0:
+            self.traced += seconds
+
+    def summary(self, duration: float) -> Dict:
+        spans = sorted(self.spans.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            'cycle': self.name,
+            'spans': {name: {'ms': round(total * 1000, 2), 'count': count} for name, (total, count) in spans},
+            'untraced_ms': round(max(duration - self.traced, 0.0) * 1000, 2)
+        }
+
+
+class Span:
+    __slots__ = ('trace', 'name', 'started', 'depth')
+
+    def __init__(self, trace: CycleTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.trace.depth
+        self.trace.depth += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.depth -= 1
+        self.trace.record(self.name, time.perf_counter() - self.started, self.depth)
+        return False
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+def span(name: str):
+    if not TRACING_ENABLED:
+        return NULL_SPAN
+    trace = current_trace.get()
+    if trace is None:
+        return NULL_SPAN
+    return Span(trace, name)
+
+
+def traced(name: Optional[str] = None):
+    def decorator(func):
+        span_name = name or func.__name__
+        if not TRACING_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SamplingProfiler:
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.captures: Dict[int, tuple] = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def start(self, thread_id: Optional[int] = None) -> Counter:
+        thread = threading.current_thread()
+        thread_id = thread_id or thread.ident
+        samples = Counter()
+        with self.lock:
+            self.captures[thread_id] = (thread.name, samples)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='cycle-profiler', daemon=True)
+                self.thread.start()
+        self.wake.set()
+        return samples
+
+    def stop(self, thread_id: Optional[int] = None) -> Counter:
+        with self.lock:
+            _, samples = self.captures.pop(thread_id or threading.get_ident(), (None, Counter()))
+        return samples
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if not self.captures:
+                    self.wake.clear()
+            self.wake.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, (name, samples) in self.captures.items():
+                    frame = frames.get(thread_id)
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    if stack:
+                        stack.append(name)
+                        samples[';'.join(reversed(stack))] += 1
+
+
+profiler = SamplingProfiler()
+
+
+def dump_profile(samples: Counter, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class cycle:
+    def __init__(self, name: str):
+        self.name = name
+        self.trace = None
+        self.token = None
+        self.samples = None
+
+    def __enter__(self):
+        if not TRACING_ENABLED:
+            return self
+        self.trace = CycleTrace(self.name)
+        self.token = current_trace.set(self.trace)
+        if PROFILE_SLOW_CYCLES:
+            self.samples = profiler.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.trace is None:
+            return False
+        duration = time.perf_counter() - self.trace.started
+        current_trace.reset(self.token)
+        summary = self.trace.summary(duration)
+        if self.samples is not None:
+            profiler.stop()
+            if duration >= PROFILE_SLOW_CYCLE_SECONDS and self.samples:
+                path = os.path.join(PROFILE_DIR, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+                try:
+                    dump_profile(self.samples, path)
+                    summary['profile'] = path
+                except OSError as e:
+                    logger.warning(f"Could not write cycle profile: {e}")
+        logger.info("Cycle trace", extra={
+            'alert_type': 'trace',
+            'duration': round(duration, 3),
+            'metrics': summary
+        })
+        return False